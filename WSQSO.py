@@ -1,24 +1,26 @@
-import sys, random, re, configparser, collections, time
+import sys, os, random, re, configparser, collections, time, json, queue, threading, socket, select, struct, argparse, math, wave
+import http.client, urllib.parse
+# Référence pour la mesure du temps de démarrage (--startup-benchmark)
+startup_time = time.perf_counter()
 import numpy as np
-from scipy.signal import argrelextrema 
-from scipy.signal import hilbert
-from datetime import datetime
+from datetime import datetime, timezone
 from PyQt6.QtWidgets import (
 	QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton,
-	QTextEdit, QVBoxLayout, QHBoxLayout, QFormLayout, QMenu, QGridLayout,
+	QVBoxLayout, QHBoxLayout, QFormLayout, QMenu, QGridLayout,
 	QFrame, QCheckBox, QDialog, QDialogButtonBox, QRadioButton, QButtonGroup, QGroupBox, QMessageBox, QComboBox, 
-	QProgressBar
+	QProgressBar, QTableView, QHeaderView, QAbstractItemView, QSpinBox
 )
 from PyQt6.QtGui import QAction, QActionGroup, QPainter, QColor, QPen, QImage, QIcon, QPalette
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QSysInfo
-from PyQt6.QtMultimedia import QAudioInput, QAudioFormat, QMediaDevices, QAudioSource
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QSysInfo, QAbstractTableModel, QSortFilterProxyModel, QModelIndex
+# QtMultimedia est importé à la demande (setup_audio, AudioConfDialog) : son chargement et
+# l'énumération des périphériques ne doivent pas retarder l'affichage de la fenêtre
 
 class TimerWorker(QThread):
 	# Signal to send updated time to the main thread
 	time_signal = pyqtSignal(int)
 
 	def run(self):
-		while True:
+		while not self.isInterruptionRequested():
 			now = datetime.now()
 			ms_to_next_second = 1 - now.microsecond / 1_000_000.0
 			time.sleep(ms_to_next_second)
@@ -99,8 +101,12 @@ class FrequencyScaleWidget(QWidget):
 
 
 class WaterfallCanvas(QWidget):
+	# Émis une seule fois, à la fin du premier dessin du waterfall à l'écran
+	first_painted = pyqtSignal()
+
 	def __init__(self, parent=None):
 		super().__init__(parent)
+		self.painted = False
 		self.spectrogram_height = 548
 		self.spectrogram_width = 400
 		self.image = QImage(self.spectrogram_width, self.spectrogram_height, QImage.Format.Format_RGB32)
@@ -170,6 +176,9 @@ class WaterfallCanvas(QWidget):
 	def paintEvent(self, event):
 		painter = QPainter(self)
 		painter.drawImage(0, 0, self.image)
+		if not self.painted:
+			self.painted = True
+			self.first_painted.emit()
 
 	def resizeEvent(self, event):
 		# Récupérer la nouvelle largeur et hauteur de la fenêtre
@@ -360,6 +369,7 @@ class AudioConfDialog(QDialog):
 		layout.addWidget(self.audio_device_combo)
 
 		# Récupérer la liste des périphériques audio disponibles
+		from PyQt6.QtMultimedia import QMediaDevices
 		self.devices = QMediaDevices.audioInputs()
 		for device in self.devices:
 			self.audio_device_combo.addItem(device.description(), device)
@@ -385,10 +395,9 @@ class AudioConfDialog(QDialog):
 			# Mettre à jour le périphérique audio dans l'objet parent
 			self.parent.audio_device = selected_device
 			
-			# Sauvegarder l'identifiant du périphérique audio dans la configuration
-			self.parent.config["Audio"] = {
-				"device_id": selected_device.id()
-			}
+			# Sauvegarder l'identifiant du périphérique audio dans la configuration, sans perdre
+			# les autres options de [Audio] (source, format...)
+			self.parent.config.read_dict({"Audio": {"device_id": selected_device.id()}})
 			
 			# Redémarrer l'audio avec le nouveau périphérique
 			self.parent.setup_audio()
@@ -402,38 +411,544 @@ class AudioConfDialog(QDialog):
 			return self.devices[index]
 		return None
 
+class RationalResampler:
+	"""Rééchantillonnage d'un rapport rationnel par filtre polyphase, bloc par bloc sans discontinuité.
+
+	Fonctionne sur des échantillons réels ou complexes. cutoff (Hz) limite la bande passante,
+	par défaut 45 % de la plus petite des deux fréquences d'échantillonnage.
+	"""
+	def __init__(self, in_rate, out_rate, cutoff=None, taps_per_phase=16):
+		g = math.gcd(int(in_rate), int(out_rate))
+		self.up = int(out_rate) // g
+		self.down = int(in_rate) // g
+		if cutoff is None:
+			cutoff = 0.45 * min(in_rate, out_rate)
+
+		# Filtre passe-bas à fenêtre de Kaiser conçu à la fréquence suréchantillonnée in_rate * up
+		num_taps = taps_per_phase * self.up
+		n = np.arange(num_taps) - (num_taps - 1) / 2
+		relative_cutoff = 2 * cutoff / (in_rate * self.up)
+		taps = relative_cutoff * np.sinc(relative_cutoff * n) * np.kaiser(num_taps, 8.0) * self.up
+		# phases[p, j] = taps[j * up + p], inversé pour s'appliquer à une fenêtre d'échantillons croissants
+		self.phases = taps.reshape(taps_per_phase, self.up).T[:, ::-1].copy()
+		self.history = np.zeros(taps_per_phase - 1)
+		# Instant (à la fréquence suréchantillonnée) de la prochaine sortie, relatif au début du bloc suivant
+		self.next_time = 0
+
+	def process(self, samples):
+		taps_per_phase = self.phases.shape[1]
+		extended = np.concatenate((self.history, samples))
+		self.history = extended[len(extended) - (taps_per_phase - 1):]
+
+		times = np.arange(self.next_time, self.up * len(samples), self.down)
+		self.next_time += len(times) * self.down - self.up * len(samples)
+		if len(times) == 0:
+			return np.zeros(0, dtype=extended.dtype)
+		windows = np.lib.stride_tricks.sliding_window_view(extended, taps_per_phase)[times // self.up]
+		return np.einsum("ij,ij->i", windows, self.phases[times % self.up])
+
+class SampleSource(QThread):
+	"""Source d'échantillons lue dans un thread (fichier, stdin, TCP).
+
+	Les données brutes sont converties en int16 mono à 48 kHz et émises par blocs vers
+	AudioProcessor.ingest, comme celles du périphérique audio Qt.
+	"""
+	samples_ready = pyqtSignal(object)
+	# Mode canaliseur : dict {bande: bande de base du décodeur} extrait du flux IQ, et audio int16
+	# à 48 kHz de la bande affichée (ou None)
+	channels_ready = pyqtSignal(object, object)
+	# Formats bruts acceptés : type NumPy et facteur pour ramener à la pleine échelle int16
+	SAMPLE_FORMATS = {
+		"s16le": ("<i2", 1.0),
+		"s16be": (">i2", 1.0),
+		"s32le": ("<i4", 1.0 / 65536),
+		"f32le": ("<f4", 32767.0),
+		"u8": ("u1", 256.0),
+	}
+	BLOCK_SIZE = 16384
+	# Intervalle (s) de vérification de la demande d'arrêt pendant les attentes
+	POLL_INTERVAL = 0.2
+
+	def __init__(self, config, sample_rate=None, sample_format=None, channels=None):
+		super().__init__()
+		self.sample_rate = sample_rate or config.getint("Audio", "sample_rate", fallback=48000)
+		self.sample_format = sample_format or config.get("Audio", "sample_format", fallback="s16le")
+		self.channels = channels or config.getint("Audio", "channels", fallback=1)
+		if self.sample_format not in self.SAMPLE_FORMATS:
+			raise ValueError(f"Unsupported sample format: {self.sample_format}")
+		self.dtype = np.dtype(self.SAMPLE_FORMATS[self.sample_format][0])
+		self.frame_size = self.dtype.itemsize * self.channels
+		self.resampler = RationalResampler(self.sample_rate, 48000) if self.sample_rate != 48000 else None
+		# Octets d'une trame incomplète en attente de la lecture suivante
+		self.remainder = b""
+		# WidebandChannelizer : les deux voies sont alors I et Q
+		self.channelizer = None
+
+	def stop(self):
+		# Les lectures et attentes vérifient la demande d'arrêt au plus tard toutes les POLL_INTERVAL s
+		self.requestInterruption()
+		self.wait()
+
+	def pause(self, delay):
+		# Attente interrompue par stop()
+		end = time.monotonic() + delay
+		while not self.isInterruptionRequested() and time.monotonic() < end:
+			time.sleep(min(self.POLL_INTERVAL, end - time.monotonic()))
+
+	def run(self):
+		try:
+			self.open()
+			while not self.isInterruptionRequested():
+				data = self.read_block(self.BLOCK_SIZE * self.frame_size)
+				if not data:
+					break
+				if self.channelizer is not None:
+					self.channels_ready.emit(*self.channelizer.process(self.convert_iq(data)))
+					continue
+				samples = self.convert(data)
+				if len(samples):
+					self.samples_ready.emit(samples)
+		except OSError as e:
+			print(f"Sample source stopped: {e}")
+		finally:
+			self.close()
+
+	def frames(self, data):
+		# Échantillons entrelacés des trames complètes, le reste est gardé pour la lecture suivante
+		if self.remainder:
+			data = self.remainder + data
+		usable = len(data) - len(data) % self.frame_size
+		self.remainder = data[usable:]
+		return np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+
+	def scaled(self, samples):
+		# Conversion en flottants à l'échelle int16
+		samples = samples.astype(np.float64)
+		if self.sample_format == "u8":
+			samples -= 128
+		samples *= self.SAMPLE_FORMATS[self.sample_format][1]
+		return samples
+
+	def convert_iq(self, data):
+		samples = self.scaled(self.frames(data)).reshape(-1, self.channels)
+		return samples[:, 0] + 1j * samples[:, 1]
+
+	def convert(self, data):
+		samples = self.frames(data)
+
+		# Cas courant : int16 mono à 48 kHz, transmis tel quel sans copie
+		if self.resampler is None and self.channels == 1 and self.sample_format == "s16le":
+			return samples
+		if self.channels > 1:
+			samples = samples[::self.channels]
+		samples = self.scaled(samples)
+		if self.resampler is not None:
+			samples = self.resampler.process(samples)
+		return np.clip(samples, -32768, 32767).astype(np.int16)
+
+	def open(self):
+		pass
+
+	def read_block(self, size):
+		raise NotImplementedError
+
+	def close(self):
+		pass
+
+class FileSampleSource(SampleSource):
+	"""Fichier WAV (format lu dans l'en-tête) ou brut, lu en temps réel ou aussi vite que possible."""
+	def __init__(self, config, path=None, realtime=None):
+		self.path = path or config.get("Audio", "path")
+		self.realtime = config.getboolean("Audio", "realtime", fallback=True) if realtime is None else realtime
+		self.wav = None
+		self.file = None
+		if self.path.lower().endswith(".wav"):
+			with wave.open(self.path, "rb") as wav:
+				sample_format = {1: "u8", 2: "s16le", 4: "s32le"}.get(wav.getsampwidth())
+				if sample_format is None:
+					raise ValueError(f"Unsupported WAV sample width: {wav.getsampwidth()} bytes")
+				super().__init__(config, wav.getframerate(), sample_format, wav.getnchannels())
+		else:
+			super().__init__(config)
+
+	def open(self):
+		if self.path.lower().endswith(".wav"):
+			self.wav = wave.open(self.path, "rb")
+		else:
+			self.file = open(self.path, "rb")
+		self.start_time = time.monotonic()
+		self.frames_read = 0
+
+	def read_block(self, size):
+		if self.wav is not None:
+			data = self.wav.readframes(size // self.frame_size)
+		else:
+			data = self.file.read(size)
+		if self.realtime:
+			# Cadencer la lecture au rythme de l'échantillonnage
+			self.frames_read += len(data) // self.frame_size
+			delay = self.start_time + self.frames_read / self.sample_rate - time.monotonic()
+			if delay > 0:
+				self.pause(delay)
+		return data
+
+	def close(self):
+		for handle in (self.wav, self.file):
+			if handle is not None:
+				handle.close()
+		self.wav = self.file = None
+
+class StdinSampleSource(SampleSource):
+	"""Échantillons bruts lus sur l'entrée standard (ex: sortie d'un démodulateur SDR dans un pipe)."""
+	# Windows : select n'accepte que des sockets, l'entrée standard est lue par un thread démon
+	# unique (partagé par les sources successives) qui transmet les blocs par cette file
+	reader_queue = None
+
+	def open(self):
+		if os.name == "nt" and StdinSampleSource.reader_queue is None:
+			StdinSampleSource.reader_queue = queue.Queue(maxsize=8)
+			threading.Thread(target=self.read_stdin, args=(StdinSampleSource.reader_queue, self.BLOCK_SIZE * self.frame_size),
+				daemon=True).start()
+
+	@staticmethod
+	def read_stdin(blocks, size):
+		# Lectures bloquantes sur le descripteur (le verrou de sys.stdin.buffer bloquerait l'arrêt
+		# de l'interpréteur) ; un bloc vide signale la fin du flux
+		fd = sys.stdin.fileno()
+		while True:
+			data = os.read(fd, size)
+			blocks.put(data)
+			if not data:
+				return
+
+	def read_block(self, size):
+		# Attendre les données par intervalles de POLL_INTERVAL, pour ne jamais rester bloqué
+		# dans une lecture que stop() ne pourrait pas interrompre
+		if StdinSampleSource.reader_queue is not None:
+			while not self.isInterruptionRequested():
+				try:
+					return StdinSampleSource.reader_queue.get(timeout=self.POLL_INTERVAL)
+				except queue.Empty:
+					pass
+			return b""
+		fd = sys.stdin.fileno()
+		while not self.isInterruptionRequested():
+			readable, _, _ = select.select([fd], [], [], self.POLL_INTERVAL)
+			if readable:
+				return os.read(fd, size)
+		return b""
+
+class TcpSampleSource(SampleSource):
+	"""Flux brut lu sur une connexion TCP, reconnectée automatiquement en cas de coupure."""
+	RECONNECT_DELAY = 2.0
+	CONNECT_TIMEOUT = 1.0
+
+	def __init__(self, config):
+		super().__init__(config)
+		self.address = (config.get("Audio", "host", fallback="127.0.0.1"), config.getint("Audio", "port", fallback=7355))
+		self.socket = None
+
+	def read_block(self, size):
+		while not self.isInterruptionRequested():
+			if self.socket is None:
+				try:
+					self.socket = socket.create_connection(self.address, timeout=self.CONNECT_TIMEOUT)
+					self.socket.settimeout(self.POLL_INTERVAL)
+					self.remainder = b""
+				except OSError as e:
+					print(f"Cannot connect to {self.address[0]}:{self.address[1]}: {e}")
+					self.pause(self.RECONNECT_DELAY)
+					continue
+			try:
+				data = self.socket.recv(size)
+			except socket.timeout:
+				continue
+			except OSError:
+				data = b""
+			if data:
+				return data
+			print(f"Connection to {self.address[0]}:{self.address[1]} lost, reconnecting")
+			self.close()
+		return b""
+
+	def close(self):
+		if self.socket is not None:
+			self.socket.close()
+			self.socket = None
+
+SAMPLE_SOURCES = {
+	"file": FileSampleSource,
+	"stdin": StdinSampleSource,
+	"tcp": TcpSampleSource,
+}
+
+# Fréquences des bandes (Hz) : fréquence du cadran, le segment WSPR est à +1400..1600 Hz
+BAND_FREQUENCIES = {
+	"2200m": 138500,
+	"630m": 475200,
+	"160m": 1839600,
+	"80m": 3569600,
+	"60m": 5288200,
+	"40m": 7041100,
+	"30m": 10141200,
+	"20m": 14098100,
+	"17m": 18107100,
+	"15m": 21097100,
+	"12m": 24927100,
+	"10m": 28127100,
+	"6m": 50295500,
+	"4m": 70092000,
+	"2m": 144490000
+}
+
+class WidebandChannelizer:
+	"""Découpe un flux IQ large bande en un flux en bande de base du décodeur par sous-bande WSPR.
+
+	Un banc de filtres polyphase (FFT de K points, suréchantillonné d'un facteur 2) calcule tous
+	les canaux en une passe ; chaque bande prend le canal le plus proche de son segment WSPR,
+	le recentre finement sur 0 Hz et le décime directement à WSPR_BASEBAND_RATE, comme
+	AudioProcessor.collect_baseband le fait pour l'audio. Seule la bande affichée est en plus
+	restituée en audio 48 kHz, comme un récepteur BLU réglé sur la fréquence du cadran, pour le waterfall.
+	"""
+	def __init__(self, config, sample_rate, band_frequencies):
+		self.sample_rate = sample_rate
+		self.center_frequency = config.getint("Channelizer", "center_frequency")
+		self.num_channels = config.getint("Channelizer", "channels", fallback=64)
+		self.decimation = self.num_channels // 2
+		taps_per_branch = config.getint("Channelizer", "taps_per_branch", fallback=8)
+		if sample_rate % self.decimation:
+			raise ValueError(f"Channelizer sample rate must be a multiple of {self.decimation}")
+		spacing = sample_rate / self.num_channels
+		channel_rate = sample_rate // self.decimation
+		# Bande dont l'audio 48 kHz alimente le waterfall (None : aucune)
+		self.display_band = None
+
+		# Filtre prototype passe-bas couvrant +/-0.6 espacement, sous forme (branche, phase) inversée
+		num_taps = self.num_channels * taps_per_branch
+		n = np.arange(num_taps) - (num_taps - 1) / 2
+		relative_cutoff = 2 * 0.6 * spacing / sample_rate
+		prototype = relative_cutoff * np.sinc(relative_cutoff * n) * np.kaiser(num_taps, 8.0)
+		# Banc de filtres en simple précision, largement suffisante devant la dynamique des échantillons
+		self.prototype = prototype[::-1].reshape(taps_per_branch, self.num_channels).astype(np.float32)
+		self.history = np.zeros(num_taps - self.decimation, dtype=np.complex64)
+		self.pending = np.zeros(0, dtype=np.complex64)
+		self.output_index = 0
+
+		# Décimation de canal vers la bande de base par les étages de WSPR_DECIMATION, le premier partant de
+		# la fréquence du canal ; son retard complète celui du banc de filtres pour égaler celui du premier
+		# étage de l'audio, afin que les dt restent ceux de l'audio
+		(audio_rate, first_rate, first_cutoff, first_taps), *next_stages = WSPR_DECIMATION
+		first_up = first_rate // math.gcd(channel_rate, first_rate)
+		first_delay = (first_taps - 1) / 2 / audio_rate - (num_taps - 1) / 2 / sample_rate
+		first_taps = max(int(round((2 * first_delay * channel_rate * first_up + 1) / first_up)), 4)
+		# Filtre audio du waterfall : segment WSPR +/-1400 Hz, bande de transition de 1600 Hz
+		transition = 1600.0
+		audio_up = 48000 // math.gcd(channel_rate, 48000)
+		audio_taps = int(np.ceil(72 / (2.285 * 2 * np.pi * transition / (channel_rate * audio_up))))
+
+		self.bands = {}
+		for band in config.get("Channelizer", "bands", fallback="").split(","):
+			band = band.strip()
+			if band not in band_frequencies:
+				continue
+			offset = band_frequencies[band] + 1500 - self.center_frequency
+			if abs(offset) > sample_rate / 2 - spacing:
+				print(f"Band {band} is outside the channelizer bandwidth, ignored")
+				continue
+			nearest = int(round(offset / spacing))
+			self.bands[band] = {
+				"channel": nearest % self.num_channels,
+				# Décalage restant entre le centre du canal et le segment WSPR, en radians par échantillon
+				"residual_step": -2 * np.pi * (offset - nearest * spacing) / channel_rate,
+				"residual_phase": 0.0,
+				"decimators": [RationalResampler(channel_rate, first_rate, first_cutoff, first_taps)]
+					+ [RationalResampler(in_rate, out_rate, cutoff, taps) for in_rate, out_rate, cutoff, taps in next_stages],
+				"audio_resampler": RationalResampler(channel_rate, 48000, cutoff=1400.0,
+					taps_per_phase=max(-(-audio_taps // audio_up), 4)),
+				"audio_phase": 0.0,
+			}
+		if not self.bands:
+			raise ValueError(f"no band of '{config.get('Channelizer', 'bands', fallback='')}' "
+				f"within {self.center_frequency} Hz +/- {sample_rate // 2} Hz")
+
+	def process(self, iq):
+		"""Traite un bloc d'échantillons complexes.
+
+		Retourne {bande: bande de base complex64 à WSPR_BASEBAND_RATE, segment WSPR à 0 Hz} et
+		l'audio int16 à 48 kHz de display_band (None si elle n'est pas canalisée).
+		"""
+		iq = np.concatenate((self.pending, iq.astype(np.complex64)))
+		usable = len(iq) - len(iq) % self.decimation
+		self.pending = iq[usable:]
+		if usable == 0:
+			return {}, None
+
+		# Banc de filtres : une fenêtre de K * T échantillons tous les D échantillons
+		extended = np.concatenate((self.history, iq[:usable]))
+		self.history = extended[usable:]
+		# Avec K = 2 D, la tranche q de la fenêtre n est la paire de blocs de D échantillons n + 2q et n + 2q + 1 :
+		# T multiplications-accumulations contiguës au lieu d'une somme sur des fenêtres glissantes
+		blocks = extended.reshape(-1, self.decimation)
+		pairs = np.concatenate((blocks[:-1], blocks[1:]), axis=1)
+		count = usable // self.decimation
+		branches = pairs[:count] * self.prototype[0]
+		for q in range(1, self.prototype.shape[0]):
+			branches += pairs[2 * q:2 * q + count] * self.prototype[q]
+		channels = self.num_channels * np.fft.ifft(branches[:, ::-1], axis=1)
+
+		outputs = np.arange(self.output_index, self.output_index + len(channels))
+		self.output_index += len(channels)
+
+		result = {}
+		audio = None
+		for band, state in self.bands.items():
+			k = state["channel"]
+			# Rotation due à la décimation par D < K, puis recentrage fin sur le segment WSPR
+			rotation = -2 * np.pi * ((k * outputs * self.decimation) % self.num_channels) / self.num_channels
+			phase = state["residual_phase"] + state["residual_step"] * np.arange(len(channels))
+			state["residual_phase"] = (phase[-1] + state["residual_step"]) % (2 * np.pi)
+			baseband = channels[:, k] * np.exp(1j * (rotation + phase))
+			decimated = baseband
+			for decimator in state["decimators"]:
+				decimated = decimator.process(decimated)
+			# Même échelle que l'audio int16 ramené à +/-1
+			result[band] = (decimated / 32768.0).astype(np.complex64)
+
+			if band == self.display_band:
+				# Segment WSPR ramené de 0 Hz à 1500 Hz audio
+				baseband = state["audio_resampler"].process(baseband)
+				audio_phase = state["audio_phase"] + 2 * np.pi * 1500 / 48000 * np.arange(len(baseband))
+				if len(baseband):
+					state["audio_phase"] = (audio_phase[-1] + 2 * np.pi * 1500 / 48000) % (2 * np.pi)
+				audio = np.clip(np.real(baseband * np.exp(1j * audio_phase)), -32768, 32767).astype(np.int16)
+		return result, audio
+
 class AudioProcessor:
-	def __init__(self, config, canvas):
-		# Chargement de la configuration et du canvas pour l'affichage
+	def __init__(self, config, canvas, band=None, clock=time.time):
+		# Chargement de la configuration et du canvas pour l'affichage (None : sans affichage)
 		self.config = config
 		self.canvas = canvas
+		# Horloge (epoch) datant les cycles ; un banc de test la fait avancer avec les échantillons fournis
+		self.clock = clock
+		# Bande fixe d'un canal du canaliseur, None pour la bande choisie dans l'interface
+		self.band = band
+		# Mode canaliseur : un AudioProcessor sans affichage par bande, et la bande affichée
+		self.band_processors = {}
+		self.display_band = None
 		# Initialisation du buffer et taille de la FFT
 		self.fft_size = 65536
 		self.buffer = np.zeros(self.fft_size, dtype=np.int16)
 		
-		# buffer intermediaire pour la taille de l'overlap
-		self.audio_buffer_accumulator = np.array([], dtype=np.int16)
+		# buffer intermediaire pour la taille de l'overlap, rempli sur place par ingest()
 		self.audio_buffer_accumulator_sub_size = 16384 # 0,341333 entre chaque fft
+		self.audio_buffer_accumulator = np.zeros(self.audio_buffer_accumulator_sub_size, dtype=np.int16)
+		self.audio_buffer_accumulator_fill = 0
+		self.audio_source = None
+		self.sample_source = None
 		
 	   # Création de la fenêtre sinusoïdale pour le fenêtrage de `self.buffer`
 		#self.window = np.sin(np.pi * np.arange(self.fft_size) / self.fft_size)  # sin(pi * i / 65536)
 		self.window = 0.5 * (1 - np.cos(2 * np.pi * np.arange(self.fft_size) / (self.fft_size - 1)))
 
+		# Fonctions appelées avec (cycle_time, decodes, band) à la fin de chaque décodage
+		self.decode_listeners = []
+		# Fonctions appelées avec (cycle_time, decode, band) dès qu'un message est décodé
+		self.decode_found_listeners = []
+		# Threads de décodage en cours ; le décodage d'un cycle doit se terminer avant le début du suivant,
+		# moins une marge (s), et chaque candidat dispose d'un budget de temps (s)
+		self.decode_threads = []
+		self.decode_deadline_margin = config.getfloat("Decode", "deadline_margin", fallback=2.0)
+		self.candidate_budget = config.getfloat("Decode", "candidate_budget", fallback=0.5)
+
+		# Derniers cycles en bande de base conservés pour le décodage cumulé sur plusieurs cycles (0 : désactivé)
+		stack_cycles = config.getint("Decode", "stack_cycles", fallback=0)
+		self.baseband_stack = BasebandStack(stack_cycles) if stack_cycles > 0 else None
+
+		# Messages déjà entendus pour le décodage a priori (0 : désactivé), partagés par les canaux
+		apriori_size = config.getint("Decode", "apriori_size", fallback=0)
+		self.callsign_index = None
+		self.callsign_loader = None
+		if apriori_size > 0 and band is None:
+			self.callsign_index = CallsignIndex(apriori_size)
+
+		# Oscillateur de translation de 1500 Hz vers 0 Hz : période exacte de 32 échantillons à 48 kHz
+		self.mixer = np.exp(-2j * np.pi * 1500 * np.arange(32) / 48000)
+		self.mixer_index = 0
+		# Décimation continue, pour disposer de la seconde précédant chaque cycle
+		self.decimators = [RationalResampler(in_rate, out_rate, cutoff, taps)
+			for in_rate, out_rate, cutoff, taps in WSPR_DECIMATION]
+		self.recent_baseband = np.zeros(WSPR_BASEBAND_PREROLL, dtype=np.complex64)
+
 		self.reset_buffers()
 
+	def learn_decodes(self, cycle_time, decodes):
+		# Les messages décodés deviennent les plus récents de l'index ; un décodage a priori ne renouvelle
+		# pas sa propre hypothèse, sans quoi une fausse correspondance ne quitterait jamais l'index
+		self.callsign_index.add_messages([(decode["call"], decode["grid"], int(decode["power"]))
+			for decode in decodes if not decode["apriori"]])
+
+	def load_known_messages(self):
+		# Fichier a priori lu et encodé en arrière-plan, une fois la fenêtre affichée (voir start_services) ;
+		# les messages décodés entre-temps restent les plus récents de l'index
+		apriori_file = self.config.get("Decode", "apriori_file", fallback="")
+		if self.callsign_index is None or not apriori_file or self.callsign_loader is not None:
+			return
+		self.callsign_loader = CallsignIndexLoader(apriori_file)
+		self.callsign_loader.loaded.connect(self.callsign_index.add_oldest)
+		self.callsign_loader.start()
+
 	def reset_buffers(self):
-		#Création du tableau des données final pour le traitement du décodage soit 512 fréquences de fft sur 375hz et 352 fenetres de 1,3653s d'echantillons sépraré de 0.341s d'interval 
-		self.WSData_buffer = np.zeros((512, 359))  # Tampon circulaire pour les données filtrées WS 512 fréquences pour 359 fft pour les futurs calculs sauf que en réalité nous en aurons que 333 sur 114s
-		self.current_fft_index = 0 
-		self.WSData_buffer_avg = np.zeros(512)
+		# Signal du cycle en bande de base complexe à 375 Hz (1500 Hz -> 0 Hz) pour le décodage ;
+		# un nouveau tableau par cycle car le précédent appartient au thread de décodage
+		self.baseband = np.zeros(WSPR_BASEBAND_SAMPLES, dtype=np.complex64)
+		self.baseband_fill = 0
 		self.flag_get_audio_data = 0
 		
 
 	def setup_audio(self):
 		# Arrêter l'audio actuel si nécessaire
-		if hasattr(self, 'audio_source') and self.audio_source:
-			self.audio_source.stop()
-			
+		self.stop_audio()
+
+		# Source autre que le périphérique audio : fichier, stdin ou flux TCP
+		source = self.config.get("Audio", "source", fallback="device")
+		if source != "device":
+			if source not in SAMPLE_SOURCES:
+				print(f"Unknown audio source '{source}' in config.ini, expected device, {', '.join(SAMPLE_SOURCES)}")
+				return
+			try:
+				self.sample_source = SAMPLE_SOURCES[source](self.config)
+			except (ValueError, OSError, wave.Error, configparser.Error) as e:
+				print(f"Cannot open {source} source: {e}")
+				return
+			if self.config.getboolean("Channelizer", "enabled", fallback=False):
+				# Flux IQ large bande découpé en une sous-bande WSPR par canal
+				if self.sample_source.channels != 2:
+					print(f"Channelizer needs an IQ stream: set channels = 2 in [Audio] (got {self.sample_source.channels})")
+					self.sample_source = None
+					return
+				try:
+					channelizer = WidebandChannelizer(self.config, self.sample_source.sample_rate, BAND_FREQUENCIES)
+				except (ValueError, configparser.Error) as e:
+					print(f"Cannot start the channelizer: {e}")
+					self.sample_source = None
+					return
+				channelizer.display_band = self.display_band
+				self.band_processors = {band: AudioProcessor(self.config, None, band, self.clock) for band in channelizer.bands}
+				for processor in self.band_processors.values():
+					processor.decode_listeners = self.decode_listeners
+					processor.decode_found_listeners = self.decode_found_listeners
+					processor.callsign_index = self.callsign_index
+				self.sample_source.channelizer = channelizer
+				self.sample_source.channels_ready.connect(self.ingest_channels)
+				print(f"Channelizing {', '.join(channelizer.bands)} from {source}")
+			else:
+				self.sample_source.samples_ready.connect(self.ingest)
+				print(f"Reading samples from {source}")
+			self.sample_source.start()
+			return
+
+		from PyQt6.QtMultimedia import QAudioFormat, QMediaDevices, QAudioSource
+
 		# Définir le format de l'audio
 		audio_format = QAudioFormat()
 		audio_format.setChannelCount(1)
@@ -447,8 +962,6 @@ class AudioProcessor:
 		devices = QMediaDevices.audioInputs()
 		device = None
 		for d in devices:
-			print(f"{device_id}")
-			print(f"{d.id()} {d.description()}")
 			if str(d.id()) == str(device_id):
 				device = d
 				print("Selected device based on configuration:", d.description())
@@ -467,81 +980,589 @@ class AudioProcessor:
 		self.audio_buffer = self.audio_source.start()
 		self.audio_buffer.readyRead.connect(self.accumulate_samples)
 		
+	def stop_audio(self):
+		if self.audio_source:
+			self.audio_source.stop()
+			self.audio_source = None
+		if self.sample_source:
+			self.sample_source.stop()
+			self.sample_source = None
+		self.band_processors = {}
+		if self.callsign_loader is not None:
+			# Le chargement du fichier a priori n'est pas interruptible mais ne dure qu'un instant
+			self.callsign_loader.wait()
+
 	def accumulate_samples(self):
 		# Lire toutes les données disponibles dans le tampon audio
 		data = self.audio_buffer.readAll()
-		samples = np.frombuffer(data, dtype=np.int16)
-		
-		# Ajouter les échantillons au tampon accumulateur
-		self.audio_buffer_accumulator = np.append(self.audio_buffer_accumulator, samples)
-		
-		# Traiter par blocs de 16384 échantillons
-		while len(self.audio_buffer_accumulator) >= self.audio_buffer_accumulator_sub_size:
-			# Récupérer exactement 16384 échantillons
-			chunk = self.audio_buffer_accumulator[:self.audio_buffer_accumulator_sub_size]
-			self.audio_buffer_accumulator = self.audio_buffer_accumulator[self.audio_buffer_accumulator_sub_size:]
-			
-			# Appeler process_audio_data avec le bloc de 16384 échantillons
-			self.process_audio_data(chunk)
+		self.ingest(np.frombuffer(data, dtype=np.int16))
 
-	def process_audio_data(self, samples):
-		
-		self.buffer = np.roll(self.buffer, -self.audio_buffer_accumulator_sub_size)
-		self.buffer[-self.audio_buffer_accumulator_sub_size:] = samples
-		
-		#A remplacer par FFT inverse!!!!
-		self.analytic_signal = hilbert(samples / 32768.0)
-		
-		windowed_buffer = self.buffer * self.window
-		
-		# Effectuer la FFT avec une taille fixée à `fft_size`
-		fft_result = np.fft.fft(windowed_buffer, n=self.fft_size)
-		freqs = np.fft.fftfreq(self.fft_size, d=1/48000)
+	def start_cycle(self):
+		# Début de l'acquisition d'un cycle, pour chaque canal en mode canaliseur
+		if self.band_processors:
+			for processor in self.band_processors.values():
+				processor.flag_get_audio_data = 1
+		else:
+			self.flag_get_audio_data = 1
+
+	def set_display_band(self, band):
+		# Bande du waterfall ; en mode canaliseur, seule celle-ci est restituée en audio 48 kHz
+		self.display_band = band
+		if self.sample_source is not None and self.sample_source.channelizer is not None:
+			self.sample_source.channelizer.display_band = band
+
+	def ingest_channels(self, channel_baseband, display_audio):
+		# Chaque canal est décodé par son propre AudioProcessor, l'audio de la bande affichée alimente le waterfall
+		for band, baseband in channel_baseband.items():
+			self.band_processors[band].ingest_baseband(baseband)
+		if display_audio is not None:
+			self.ingest(display_audio)
+
+	def ingest(self, samples):
+		"""Point d'entrée commun de toutes les sources : échantillons int16 mono à 48 kHz."""
+		size = self.audio_buffer_accumulator_sub_size
+		offset = 0
+		while offset < len(samples):
+			if self.audio_buffer_accumulator_fill == 0 and len(samples) - offset >= size:
+				# Bloc complet disponible : le traiter directement, sans copie intermédiaire
+				self.process_audio_data(samples[offset:offset + size])
+				offset += size
+				continue
+
+			# Compléter le tampon accumulateur
+			count = min(size - self.audio_buffer_accumulator_fill, len(samples) - offset)
+			self.audio_buffer_accumulator[self.audio_buffer_accumulator_fill:self.audio_buffer_accumulator_fill + count] = samples[offset:offset + count]
+			self.audio_buffer_accumulator_fill += count
+			offset += count
+			if self.audio_buffer_accumulator_fill == size:
+				self.process_audio_data(self.audio_buffer_accumulator)
+				self.audio_buffer_accumulator_fill = 0
 
-		# Filtrer les fréquences entre 1300 et 1700 Hz
-		mask = (freqs >= 1300) & (freqs <= 1700)
-		# S'assurer que le masque a la même taille que fft_result
-		filtered_fft = np.abs(fft_result[mask])
-		# Mettre à jour le graphique avec les nouvelles données FFT
-		self.canvas.update_data(filtered_fft)
+	def process_audio_data(self, samples):
+		# FFT de 65536 points réservée au waterfall, le décodeur calcule son propre spectrogramme
+		if self.canvas is not None:
+			self.buffer = np.roll(self.buffer, -self.audio_buffer_accumulator_sub_size)
+			self.buffer[-self.audio_buffer_accumulator_sub_size:] = samples
+			
+			windowed_buffer = self.buffer * self.window
+			
+			# Effectuer la FFT avec une taille fixée à `fft_size`
+			fft_result = np.fft.fft(windowed_buffer, n=self.fft_size)
+			freqs = np.fft.fftfreq(self.fft_size, d=1/48000)
+
+			# Filtrer les fréquences entre 1300 et 1700 Hz
+			mask = (freqs >= 1300) & (freqs <= 1700)
+			# S'assurer que le masque a la même taille que fft_result
+			filtered_fft = np.abs(fft_result[mask])
+			# Mettre à jour le graphique avec les nouvelles données FFT
+			self.canvas.update_data(filtered_fft)
 					
+		# En mode canaliseur, ce sont les AudioProcessor des canaux qui décodent
+		if not self.band_processors:
+			self.collect_baseband(samples)
+
+	def collect_baseband(self, samples):
+		# Translation de 1500 Hz vers 0 Hz puis décimation 48 kHz -> 375 Hz
+		mixed = samples / 32768.0 * self.mixer[(self.mixer_index + np.arange(len(samples))) % len(self.mixer)]
+		self.mixer_index = (self.mixer_index + len(samples)) % len(self.mixer)
+		for decimator in self.decimators:
+			mixed = decimator.process(mixed)
+		self.ingest_baseband(mixed)
+
+	def ingest_baseband(self, baseband):
+		"""Bande de base complexe à WSPR_BASEBAND_RATE, segment WSPR à 0 Hz : acquisition du cycle."""
 		if self.flag_get_audio_data == 1:
-			# Filtrer les fréquences entre 1312.5 et 1687.5 Hz pour le buffer circulaire
-			#band_center = 1500, bandwidth = 375 => start_frequency = 1312.5 & end_frequency = 1687.5
-			specific_mask = (freqs >= 1313) & (freqs <= 1688)
-			#specific_filtered_fft = np.abs(fft_result[specific_mask])
-			fft_result_masqued = fft_result[specific_mask]
-			specific_filtered_fft = np.real(fft_result_masqued) ** 2 + np.imag(fft_result_masqued) ** 2
-
-			# Ajouter les nouvelles données au buffer circulaire
-			self.WSData_buffer[:, self.current_fft_index] = specific_filtered_fft
-			self.WSData_buffer_avg += specific_filtered_fft
+			if self.baseband_fill == 0:
+				# Début du cycle : reprendre la seconde précédente
+				self.baseband[:WSPR_BASEBAND_PREROLL] = self.recent_baseband
+				self.baseband_fill = WSPR_BASEBAND_PREROLL
+			count = min(len(baseband), WSPR_BASEBAND_SAMPLES - self.baseband_fill)
+			self.baseband[self.baseband_fill:self.baseband_fill + count] = baseband[:count]
+			self.baseband_fill += count
 			
-			self.current_fft_index = self.current_fft_index + 1
-		
-		if self.current_fft_index == 334: #(114s)
-			# Instancier la classe `WSDecode_messages` et démarrer le thread pour afficher les spectres
-			self.ws_decode_thread = WSDecode_messages(self.WSData_buffer,self.WSData_buffer_avg)
-			self.ws_decode_thread.start()
-			self.reset_buffers()
+			if self.baseband_fill == WSPR_BASEBAND_SAMPLES: #(115s)
+				self.start_decode()
+		self.recent_baseband = np.concatenate((self.recent_baseband, baseband))[-WSPR_BASEBAND_PREROLL:]
+
+	def start_decode(self):
+		# Instancier la classe `WSDecode_messages` et démarrer le thread de décodage
+		# Début du cycle (minute paire) auquel appartiennent les données
+		now = self.clock()
+		cycle_time = float(int(now) // 120 * 120)
+		history = []
+		if self.baseband_stack is not None:
+			history = self.baseband_stack.snapshot()
+			self.baseband_stack.push(self.baseband)
+		# Un décodage encore en cours ne doit pas s'empiler avec le nouveau : l'arrêter
+		self.decode_threads = [thread for thread in self.decode_threads if thread.isRunning()]
+		for thread in self.decode_threads:
+			thread.requestInterruption()
+
+		# Le thread de décodage compte en temps réel : reporter le temps restant sur time.time()
+		deadline = time.time() + (cycle_time + 120 - self.decode_deadline_margin - now)
+		known = self.callsign_index.snapshot() if self.callsign_index is not None else None
+		self.ws_decode_thread = WSDecode_messages(self.baseband, cycle_time, history,
+			deadline, self.candidate_budget, known)
+		if self.callsign_index is not None:
+			self.ws_decode_thread.decodes_ready.connect(self.learn_decodes)
+		for listener in self.decode_listeners:
+			self.ws_decode_thread.decodes_ready.connect(
+				lambda cycle_time, decodes, listener=listener, band=self.band: listener(cycle_time, decodes, band))
+		for listener in self.decode_found_listeners:
+			self.ws_decode_thread.decode_found.connect(
+				lambda cycle_time, decode, listener=listener, band=self.band: listener(cycle_time, decode, band))
+		self.decode_threads.append(self.ws_decode_thread)
+		self.ws_decode_thread.start()
+		self.reset_buffers()
 			
 		
-class Candidate:
-	def __init__(self):
-		self.freq = 0.0
-		self.snr = 0.0
-		self.drift = 0.0
-		self.shift = 0
-		self.sync = 0.0
+# Vecteur de synchronisation WSPR : bit de poids faible de chacun des 162 symboles
+WSPR_SYNC = np.array([
+	1,1,0,0,0,0,0,0,1,0,0,0,1,1,1,0,0,0,1,0,0,1,0,1,1,1,1,0,0,0,0,0,0,0,1,0,0,1,0,1,
+	0,0,0,0,0,0,1,0,1,1,0,0,1,1,0,1,0,0,0,1,1,0,1,0,0,0,0,1,1,0,1,0,1,0,1,0,1,0,0,1,
+	0,0,1,0,1,1,0,0,0,1,1,0,1,0,1,0,0,0,1,0,0,0,0,0,1,0,0,1,0,0,1,1,1,0,1,1,0,0,1,1,
+	0,1,0,0,0,1,1,1,0,0,0,0,0,1,0,1,0,0,1,1,0,0,0,0,0,0,0,1,1,0,1,0,1,1,0,0,0,1,1,0,
+	0,0], dtype=np.uint8)
+# Position dans la trame émise du p-ième symbole du codeur convolutif (entrelacement par inversion de bits)
+WSPR_INTERLEAVE = np.array([j for j in (int(f"{i:08b}"[::-1], 2) for i in range(256)) if j < 162])
+# Polynômes du code convolutif K=32, r=1/2
+WSPR_POLY1 = 0xf2d05351
+WSPR_POLY2 = 0xe4613c47
+WSPR_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ "
+WSPR_SYMBOLS = 162
+# Durée d'un symbole (8192 échantillons à 12 kHz), soit deux colonnes du buffer de décodage
+WSPR_SYMBOL_PERIOD = 8192 / 12000
+# Décalage en bins de 0.732 Hz des 4 tons par rapport au centre du signal
+WSPR_TONE_BINS = np.array([-3, -1, 1, 3])
+# Facteur d'échelle des symboles souples (écart-type unité -> 50) autour de 128
+WSPR_SOFT_SCALE = 50.0
+# Bande de base du décodeur : 375 Hz, soit 256 échantillons par symbole. Un cycle comprend la seconde
+# précédant la minute paire puis 115 s de signal, soit des dt de -1.7 à +2 s
+WSPR_BASEBAND_RATE = 375
+WSPR_BASEBAND_PREROLL = WSPR_BASEBAND_RATE
+WSPR_BASEBAND_SAMPLES = WSPR_BASEBAND_PREROLL + 115 * WSPR_BASEBAND_RATE
+# Décimation en deux étages (fréquence d'entrée, de sortie, coupure, coefficients) et retard introduit (s)
+WSPR_DECIMATION = ((48000, 1500, 300.0, 256), (1500, WSPR_BASEBAND_RATE, 160.0, 192))
+WSPR_BASEBAND_DELAY = sum((taps - 1) / 2 / in_rate for in_rate, _, _, taps in WSPR_DECIMATION)
+# Spectrogramme de décodage : fenêtre de Hann de deux symboles centrée sur un symbole, une colonne par
+# demi-symbole (128 échantillons). Une fenêtre d'un seul symbole perd environ 1 dB de sensibilité
+WSPR_STFT_WINDOW = np.hanning(512)
+WSPR_STFT_HOP = 128
+# Décalage (s) entre le début de la colonne 0 et celui d'un message émis à l'heure (1 s après la minute paire)
+WSPR_STFT_TIME_OFFSET = (1.0 + WSPR_BASEBAND_PREROLL / WSPR_BASEBAND_RATE + WSPR_BASEBAND_DELAY
+	- (WSPR_STFT_WINDOW.size / WSPR_BASEBAND_RATE - WSPR_SYMBOL_PERIOD) / 2)
+# Seuils de synchronisation pour tenter le décodage sur un cycle seul, ou d'inclure un cycle dans le cumul
+WSPR_MIN_SYNC = 0.10
+WSPR_MIN_STACK_SYNC = 0.05
+# Corrélation minimale entre un message décodé par cumul et les symboles du cycle courant (bruit : ~0.08 d'écart-type)
+WSPR_MIN_STACK_CORRELATION = 0.25
+# Décodage a priori : corrélation minimale avec le message connu (le bruit seul donne ~0.08 d'écart-type)
+# et avance minimale sur la deuxième hypothèse
+WSPR_APRIORI_MIN_SCORE = 0.5
+WSPR_APRIORI_MARGIN = 0.1
+
+def wspr_parity(x):
+	return bin(x).count("1") & 1
+
+def wspr_branch_symbols(state):
+	# Paire de symboles émise par le codeur pour un état donné (bit 1 : POLY1, bit 0 : POLY2)
+	return (wspr_parity(state & WSPR_POLY1) << 1) | wspr_parity(state & WSPR_POLY2)
+
+def wspr_pack(call, grid, power):
+	"""Compresse un message WSPR de type 1 en 50 bits (7 octets)."""
+	call = call.strip().upper()
+	if len(call) > 2 and not call[2].isdigit():
+		call = " " + call
+	call = call.ljust(6)
+	if len(call) != 6 or not call[2].isdigit() or any(c not in WSPR_CHARS for c in call):
+		raise ValueError(f"Invalid WSPR callsign: {call.strip()}")
+	codes = [WSPR_CHARS.index(c) for c in call]
+	if codes[1] == 36 or any(code < 10 for code in codes[3:]):
+		raise ValueError(f"Invalid WSPR callsign: {call.strip()}")
+	n = codes[0]
+	n = n * 36 + codes[1]
+	n = n * 10 + codes[2]
+	for code in codes[3:]:
+		n = n * 27 + code - 10
+
+	grid = grid.upper()
+	if not re.match(r"^[A-R]{2}[0-9]{2}$", grid[:4]) or not 0 <= power <= 60:
+		raise ValueError(f"Invalid WSPR grid or power: {grid} {power}")
+	m = (179 - 10 * (ord(grid[0]) - 65) - int(grid[2])) * 180 + 10 * (ord(grid[1]) - 65) + int(grid[3])
+	m = m * 128 + power + 64
+
+	return bytes([
+		(n >> 20) & 0xff, (n >> 12) & 0xff, (n >> 4) & 0xff,
+		((n & 0x0f) << 4) | ((m >> 18) & 0x0f),
+		(m >> 10) & 0xff, (m >> 2) & 0xff, (m & 0x03) << 6])
+
+def wspr_unpack(data):
+	"""Décompresse 7 octets en (call, grid, power), ou None si ce n'est pas un message de type 1 valide."""
+	n = (data[0] << 20) | (data[1] << 12) | (data[2] << 4) | (data[3] >> 4)
+	m = ((data[3] & 0x0f) << 18) | (data[4] << 10) | (data[5] << 2) | (data[6] >> 6)
+
+	codes = []
+	for base in (27, 27, 27):
+		codes.append(n % base + 10)
+		n //= base
+	codes.append(n % 10)
+	n //= 10
+	codes.append(n % 36)
+	n //= 36
+	codes.append(n)
+	if codes[-1] > 36:
+		return None
+	call = "".join(WSPR_CHARS[code] for code in reversed(codes)).strip()
+
+	power = (m & 127) - 64
+	m >>= 7
+	t = 179 - m // 180
+	if t < 0 or t // 10 >= 18 or (m % 180) // 10 >= 18:
+		return None
+	grid = chr(65 + t // 10) + chr(65 + (m % 180) // 10) + str(t % 10) + str(m % 10)
+
+	if not 0 <= power <= 60 or power % 10 not in (0, 3, 7):
+		return None
+	if not re.match(r"^[A-Z0-9]{0,2}[0-9][A-Z]{1,3}$", call):
+		return None
+	return call, grid, power
+
+def wspr_encode(call, grid, power):
+	"""Symboles de canal (0-3) d'un message WSPR de type 1."""
+	data = wspr_pack(call, grid, power) + bytes(4)
+	symbols = np.zeros(WSPR_SYMBOLS, dtype=np.uint8)
+	state = 0
+	for i in range(WSPR_SYMBOLS // 2):
+		state = ((state << 1) | ((data[i >> 3] >> (7 - (i & 7))) & 1)) & 0xffffffff
+		branch = wspr_branch_symbols(state)
+		symbols[2 * i] = branch >> 1
+		symbols[2 * i + 1] = branch & 1
+	interleaved = np.zeros(WSPR_SYMBOLS, dtype=np.uint8)
+	interleaved[WSPR_INTERLEAVE] = symbols
+	return WSPR_SYNC + 2 * interleaved
+
+def wspr_generator_matrix():
+	# Code convolutif sous forme matricielle : symbole 2k (2k+1) = somme sur j des bits k-j pondérés par le bit j de POLY1 (POLY2), mod 2
+	taps = np.array([[(poly >> j) & 1 for j in range(32)] for poly in (WSPR_POLY1, WSPR_POLY2)], dtype=np.uint8)
+	generator = np.zeros((50, WSPR_SYMBOLS), dtype=np.uint8)
+	for i in range(50):
+		k = np.arange(i, min(i + 32, WSPR_SYMBOLS // 2))
+		generator[i, 2 * k] = taps[0, k - i]
+		generator[i, 2 * k + 1] = taps[1, k - i]
+	return generator
+
+WSPR_GENERATOR = wspr_generator_matrix()
+
+def wspr_data_bits(messages):
+	"""Bits de données entrelacés (0/1, ordre d'émission) d'une liste de messages (call, grid, power), encodés d'un bloc."""
+	packed = np.array([list(wspr_pack(*message)) for message in messages], dtype=np.uint8).reshape(-1, 7)
+	bits = np.unpackbits(packed, axis=1)[:, :50]
+	symbols = (bits.astype(np.int32) @ WSPR_GENERATOR) & 1
+	interleaved = np.zeros((len(packed), WSPR_SYMBOLS), dtype=np.uint8)
+	interleaved[:, WSPR_INTERLEAVE] = symbols
+	return interleaved
+
+def wspr_metric_table(amplitude=0.5, bias=0.45):
+	# Métrique de Fano (x10) pour chaque symbole souple 0-255, modèle gaussien de rapport signal/bruit modéré
+	y = (np.arange(256) - 128) / WSPR_SOFT_SCALE
+	variance = 1.0 - amplitude ** 2
+	p0 = np.exp(-(y + amplitude) ** 2 / (2 * variance))
+	p1 = np.exp(-(y - amplitude) ** 2 / (2 * variance))
+	metric0 = np.rint(10 * (np.log2(2 * p0 / (p0 + p1)) - bias)).astype(int)
+	metric1 = np.rint(10 * (np.log2(2 * p1 / (p0 + p1)) - bias)).astype(int)
+	return metric0.tolist(), metric1.tolist()
+
+WSPR_METRIC_TABLE = wspr_metric_table()
+
+def fano_decode(symbols, delta=60, max_cycles=10000, deadline=None):
+	"""Décodeur séquentiel de Fano (d'après fano.c de KA9Q, utilisé par wsprd).
+
+	symbols : 162 symboles souples (0-255) dans l'ordre du codeur.
+	Retourne les 7 octets du message, ou None si le décodage n'a pas abouti en max_cycles itérations
+	ou avant l'heure deadline (epoch).
+	"""
+	nbits = WSPR_SYMBOLS // 2
+	tail = nbits - 31
+	metric0, metric1 = WSPR_METRIC_TABLE
+	metrics = [(metric0[a] + metric0[b], metric0[a] + metric1[b], metric1[a] + metric0[b], metric1[a] + metric1[b])
+		for a, b in zip(symbols[0::2].tolist(), symbols[1::2].tolist())]
+
+	gamma = [0] * (nbits + 1)
+	encstate = [0] * (nbits + 1)
+	best_metric = [0] * nbits
+	second_metric = [0] * nbits
+	branch = [0] * nbits
+
+	# Métriques triées des deux branches issues de la racine
+	lsym = wspr_branch_symbols(0)
+	m0, m1 = metrics[0][lsym], metrics[0][3 ^ lsym]
+	if m0 > m1:
+		best_metric[0], second_metric[0] = m0, m1
+	else:
+		best_metric[0], second_metric[0] = m1, m0
+		encstate[0] += 1
+	n = 0
+	threshold = 0
+
+	for cycle in range(max_cycles):
+		if deadline is not None and cycle & 511 == 0 and time.time() >= deadline:
+			return None
+		# Regarder en avant
+		ngamma = gamma[n] + (second_metric[n] if branch[n] else best_metric[n])
+		if ngamma >= threshold:
+			if gamma[n] < threshold + delta:
+				# Premier passage sur ce noeud : resserrer le seuil
+				while ngamma >= threshold + delta:
+					threshold += delta
+			gamma[n + 1] = ngamma
+			encstate[n + 1] = (encstate[n] << 1) & 0xffffffff
+			n += 1
+			if n == nbits:
+				break
+			lsym = wspr_branch_symbols(encstate[n])
+			if n >= tail:
+				# La queue ne contient que des zéros
+				best_metric[n] = metrics[n][lsym]
+			else:
+				m0, m1 = metrics[n][lsym], metrics[n][3 ^ lsym]
+				if m0 > m1:
+					best_metric[n], second_metric[n] = m0, m1
+				else:
+					best_metric[n], second_metric[n] = m1, m0
+					encstate[n] += 1
+			branch[n] = 0
+			continue
+
+		# Seuil dépassé : revenir en arrière
+		while True:
+			if n == 0 or gamma[n - 1] < threshold:
+				# Impossible de reculer : relâcher le seuil et repartir sur la meilleure branche
+				threshold -= delta
+				if branch[n] != 0:
+					branch[n] = 0
+					encstate[n] ^= 1
+				break
+			n -= 1
+			if n < tail and branch[n] != 1:
+				# Essayer la seconde branche
+				branch[n] += 1
+				encstate[n] ^= 1
+				break
+	else:
+		return None
+
+	return bytes(encstate[7 + 8 * i] & 0xff for i in range(7))
+
+def wspr_sync_search(amplitude, center_bins, drifts, time_offset):
+	"""Synchronisation grossière d'un candidat sur un spectrogramme d'amplitude (bins de 0.732 Hz, colonnes d'un demi-symbole).
+
+	Essaie chaque bin central, dérive (en bins sur la durée du message) et décalage temporel.
+	Retourne (sync, bin, drift, shift, dt, soft) pour la meilleure combinaison, soft étant les
+	162 métriques souples normalisées des bits de données dans l'ordre d'émission.
+	"""
+	k = np.arange(WSPR_SYMBOLS)
+	max_shift = amplitude.shape[1] - 2 * (WSPR_SYMBOLS - 1)
+	shifts = np.arange(max(max_shift, 1))
+	drift_offsets = np.rint(np.outer(drifts, (k - 81) / 162.0)).astype(int)
+	rows = (np.asarray(center_bins)[:, None, None, None] + drift_offsets[None, :, None, :]
+		+ WSPR_TONE_BINS[None, None, :, None])
+	rows = np.clip(rows, 0, amplitude.shape[0] - 1)
+	cols = np.minimum(2 * k[:, None] + shifts[None, :], amplitude.shape[1] - 1)
+	# Amplitudes des 4 tons : (bin, dérive, ton, symbole, décalage)
+	powers = amplitude[rows[..., None], cols]
+
+	sync_sign = 2.0 * WSPR_SYNC - 1.0
+	difference = (powers[:, :, 1] + powers[:, :, 3]) - (powers[:, :, 0] + powers[:, :, 2])
+	sync = np.einsum("bdks,k->bds", difference, sync_sign) / powers.sum(axis=(2, 3))
+	ib, idrift, ishift = np.unravel_index(np.argmax(sync), sync.shape)
+
+	best = powers[ib, idrift, :, :, ishift]
+	soft = np.where(WSPR_SYNC == 0, best[2] - best[0], best[3] - best[1])
+	soft = soft / (np.sqrt(np.mean(soft ** 2)) + 1e-12)
+	dt = ishift * WSPR_SYMBOL_PERIOD / 2 - time_offset
+	return sync[ib, idrift, ishift], center_bins[ib], drifts[idrift], shifts[ishift], dt, soft
+
+def wspr_decode_soft(soft, deadline=None):
+	"""Décode des métriques souples normalisées (ordre d'émission) ; retourne (call, grid, power) ou None."""
+	symbols = np.clip(np.rint(128 + WSPR_SOFT_SCALE * soft), 0, 255).astype(np.uint8)
+	data = fano_decode(symbols[WSPR_INTERLEAVE], deadline=deadline)
+	if data is None:
+		return None
+	return wspr_unpack(data)
+
+def wspr_spectrogram(baseband):
+	"""Spectrogramme de puissance d'un cycle en bande de base à 375 Hz, calculé d'un bloc.
+
+	Une FFT de 512 points par demi-symbole, toutes calculées par un seul appel sur une vue glissante :
+	512 lignes de 0.732 Hz (ligne 256 : 1500 Hz) et une colonne toutes les 0.341 s.
+	"""
+	frames = np.lib.stride_tricks.sliding_window_view(baseband, WSPR_STFT_WINDOW.size)[::WSPR_STFT_HOP]
+	spectrum = np.fft.fftshift(np.fft.fft(frames * WSPR_STFT_WINDOW, axis=1), axes=1)
+	return (spectrum.real ** 2 + spectrum.imag ** 2).T
+
+class BasebandStack:
+	"""Signaux en bande de base des derniers cycles, conservés pour le décodage cumulé."""
+	def __init__(self, max_cycles):
+		self.cycles = collections.deque(maxlen=max_cycles)
+
+	def push(self, baseband):
+		# complex64 à 375 Hz : environ 340 ko par cycle, le tableau n'est plus modifié après le cycle
+		self.cycles.append(baseband)
+
+	def snapshot(self):
+		return list(self.cycles)
+
+class CallsignIndex:
+	"""Messages déjà entendus (ou fournis par l'utilisateur) pour le décodage a priori, du moins au plus récemment vu.
+
+	Chaque message est stocké sous la forme de ses 162 bits de données entrelacés (+1/-1, ordre d'émission),
+	directement comparables aux métriques souples de wspr_sync_search.
+	"""
+	def __init__(self, capacity):
+		self.capacity = capacity
+		self.rows = collections.OrderedDict()  # (call, grid, power) -> ligne de self.hypotheses
+		self.hypotheses = np.zeros((capacity, WSPR_SYMBOLS), dtype=np.float32)
+
+	def __len__(self):
+		return len(self.rows)
+
+	def add(self, call, grid, power):
+		self.add_messages([(call, grid, int(power))])
+
+	def add_messages(self, messages):
+		# Les messages déjà connus deviennent les plus récents, les nouveaux sont encodés ensemble
+		new = {}
+		for message in messages:
+			if message in self.rows:
+				self.rows.move_to_end(message)
+			else:
+				new[message] = None
+		new = list(new)[-self.capacity:]
+		if not new:
+			return
+		rows = []
+		for message in new:
+			if len(self.rows) + len(rows) < self.capacity:
+				rows.append(len(self.rows) + len(rows))
+			else:
+				# Remplace le message le moins récemment entendu
+				rows.append(self.rows.popitem(last=False)[1])
+		self.hypotheses[rows] = 2.0 * wspr_data_bits(new) - 1.0
+		for message, row in zip(new, rows):
+			self.rows[message] = row
+
+	def add_oldest(self, messages, hypotheses):
+		"""Ajoute des messages déjà encodés comme les moins récents, sans écarter ceux entendus entre-temps."""
+		# Parcours à rebours : la fin de la liste est la plus récente et reste prioritaire si la place manque
+		for message, hypothesis in zip(reversed(messages), hypotheses[::-1]):
+			if len(self.rows) >= self.capacity:
+				break
+			if message in self.rows:
+				continue
+			row = len(self.rows)
+			self.hypotheses[row] = hypothesis
+			self.rows[message] = row
+			self.rows.move_to_end(message, last=False)
+
+	@staticmethod
+	def read(path):
+		"""Messages d'un fichier texte, une ligne "CALL GRID POWER" par message (# : commentaire)."""
+		messages = []
+		try:
+			with open(path, encoding="utf-8") as known_file:
+				for line in known_file:
+					fields = line.split("#", 1)[0].upper().split()
+					if len(fields) != 3:
+						continue
+					try:
+						wspr_pack(fields[0], fields[1], int(fields[2]))
+					except (ValueError, KeyError, IndexError):
+						print(f"Ignoring a-priori message: {line.strip()}")
+						continue
+					messages.append((fields[0], fields[1], int(fields[2])))
+		except OSError as e:
+			print(f"A-priori file {path} not readable: {e}")
+		return messages
+
+	def snapshot(self):
+		# Copie pour le thread de décodage : (messages, matrice des hypothèses correspondantes)
+		return list(self.rows), self.hypotheses[list(self.rows.values())]
+
+class CallsignIndexLoader(QThread):
+	"""Lecture et encodage du fichier a priori hors du thread de l'interface."""
+	# Messages du fichier et leurs hypothèses (+1/-1), à passer à CallsignIndex.add_oldest
+	loaded = pyqtSignal(list, object)
+
+	def __init__(self, path):
+		super().__init__()
+		self.path = path
+
+	def run(self):
+		messages = CallsignIndex.read(self.path)
+		hypotheses = 2.0 * wspr_data_bits(messages) - 1.0 if messages else np.zeros((0, WSPR_SYMBOLS))
+		self.loaded.emit(messages, hypotheses.astype(np.float32))
+
+def wspr_apriori_decode(soft, messages, hypotheses):
+	"""Corrèle des métriques souples normalisées avec tous les messages connus ; retourne le message retenu ou None."""
+	if len(messages) == 0:
+		return None
+	scores = hypotheses @ soft.astype(np.float32) / WSPR_SYMBOLS
+	best = int(np.argmax(scores))
+	second = np.partition(scores, -2)[-2] if len(scores) > 1 else 0.0
+	if scores[best] < WSPR_APRIORI_MIN_SCORE or scores[best] - second < WSPR_APRIORI_MARGIN:
+		return None
+	return messages[best]
+
+# Table des candidats : un enregistrement par maximum local du spectre moyen
+CANDIDATE_DTYPE = np.dtype([
+	("freq", np.float64),  # Hz, relatif à 1500 Hz
+	("snr", np.float64),  # dB dans 2500 Hz
+	("drift", np.float64),  # Hz sur la durée du message
+	("shift", np.int32),  # décalage temporel en colonnes
+	("sync", np.float64),
+	("status", np.int8),
+])
+# Valeurs de la colonne status
+CANDIDATE_PENDING, CANDIDATE_DECODED, CANDIDATE_FAILED = range(3)
+MAX_CANDIDATES = 200
 
 class WSDecode_messages(QThread):
-	def __init__(self, buffer, buffer_avg):
+	# Signal émis en fin de décodage : début du cycle (epoch) et liste des messages décodés
+	# Chaque message est un dict : freq (Hz audio), snr, dt, drift, call, grid, power,
+	# stacked (décodé par cumul de plusieurs cycles) et apriori (par corrélation avec un message connu)
+	decodes_ready = pyqtSignal(float, list)
+	# Signal émis dès qu'un message est décodé, avant la fin du cycle de décodage
+	decode_found = pyqtSignal(float, dict)
+	# Signal émis en fin de décodage avec les compteurs du cycle (voir self.metrics)
+	metrics_ready = pyqtSignal(dict)
+
+	def __init__(self, baseband, cycle_time, history=(), deadline=None, candidate_budget=0.5, known=None):
 		super().__init__()
-		self.buffer = buffer
-		self.buffer_avg = buffer_avg
+		# Signal du cycle en bande de base complexe à 375 Hz (voir AudioProcessor.collect_baseband)
+		self.baseband = baseband
+		self.cycle_time = cycle_time
+		# Bandes de base des cycles précédents (BasebandStack), du plus ancien au plus récent
+		self.history = history
+		self.history_amplitudes = None
+		# Heure (time.time()) à laquelle le travail restant est abandonné : par défaut le début du cycle suivant
+		self.deadline = deadline if deadline is not None else cycle_time + 120
+		# Durée maximale (s) du décodage d'un candidat
+		self.candidate_budget = candidate_budget
+		# Messages connus (CallsignIndex.snapshot) essayés quand le décodage de Fano échoue
+		self.known = known
+		self.decodes = []
+		self.candidates = np.zeros(0, dtype=CANDIDATE_DTYPE)
+		self.metrics = {}
+
+	def out_of_time(self):
+		return self.isInterruptionRequested() or time.time() >= self.deadline
 			
 	def run(self):
 		
+		# Spectrogramme aligné sur les symboles et spectre moyen du cycle
+		power = wspr_spectrogram(self.baseband)
+		buffer_avg = power.sum(axis=1)
+
 		#Smooth with 7-point window and limit spectrum to +/-150 Hz
 		# Création de la fenêtre (inutile d'utiliser une boucle pour une fenêtre uniforme)
 		window = np.ones(7)
@@ -549,7 +1570,7 @@ class WSDecode_messages(QThread):
 		indices = np.arange(411).reshape(-1, 1) + np.arange(-3, 4)  # Crée une matrice des indices pour chaque 'i' et 'j'
 		indices += (256 - 205)  # Applique le décalage sur chaque indice
 		# Récupération des valeurs depuis buffer_avg en utilisant les indices
-		buffer_avg_values = self.buffer_avg[indices]
+		buffer_avg_values = buffer_avg[indices]
 		# Application de la fenêtre sur les valeurs récupérées et somme le long de l'axe des 'j'
 		smspec = np.sum(buffer_avg_values * window, axis=1)
 		
@@ -568,40 +1589,634 @@ class WSDecode_messages(QThread):
 		fmin = -150  # Erreur de fréquence minimale en Hz
 		fmax = 150   # Erreur de fréquence maximale en Hz
 		
-		# Initialisation d'une liste dynamique pour stocker les candidats
-		candidates = []
-				
-		# Calculer les maxima locaux dans smspec
-		local_maxima_indices = argrelextrema(smspec, np.greater)[0]
-
-		# Créer une liste des candidats à partir des maxima locaux
-		filtered_candidates_indices = [j for j in local_maxima_indices if 1 <= j < 410]
-
-		# Limiter la liste de candidats à un maximum de 200 et les filtrer par fmin et fmax
-		for j in filtered_candidates_indices:
-			candidate_freq = (j - 205) * df
-			if len(candidates) < 200 and fmin <= candidate_freq <= fmax:
-				# Créer un nouveau candidat
-				candidate = Candidate()
-				candidate.freq = candidate_freq
-				candidate.snr = 10 * np.log10(smspec[j]) - snr_scaling_factor
-				candidates.append(candidate)
-
-		# sort sur snr pour trier les candidats par ordre décroissant de snr
-		candidates.sort(key=lambda x: x.snr, reverse=True)
-		
-		maxdrift=2
-		nffts = len(self.buffer)
-
-		print(len(candidates))
-		
-		print("\n\n")
-		# Vérification des valeurs des premiers candidats pour débogage
-		for i in range(min(10, len(candidates))):
-			candidates[i].freq = 1500 + candidates[i].freq
-			print(vars(candidates[i]))
-		print("\n\n")
-			
+		# Calculer les maxima locaux dans smspec (indices 1 à 409) et les filtrer par fmin et fmax
+		peaks = np.flatnonzero((smspec[1:-1] > smspec[:-2]) & (smspec[1:-1] > smspec[2:])) + 1
+		peak_freqs = (peaks - 205) * df
+		peaks = peaks[(peak_freqs >= fmin) & (peak_freqs <= fmax)]
+
+		candidates = np.zeros(len(peaks), dtype=CANDIDATE_DTYPE)
+		candidates["freq"] = (peaks - 205) * df
+		candidates["snr"] = 10 * np.log10(smspec[peaks]) - snr_scaling_factor
+		# Trier par snr décroissant et garder les 200 plus forts
+		candidates = candidates[np.argsort(-candidates["snr"], kind="stable")[:MAX_CANDIDATES]]
+
+		# Dérives essayées, en bins de 0.732 Hz sur la durée du message
+		maxdrift = 3
+		drifts = np.arange(-maxdrift, maxdrift + 1)
+		# Colonne i : centrée sur un symbole commençant i * 0.341 s après la colonne 0 (voir WSPR_STFT_TIME_OFFSET)
+		time_offset = WSPR_STFT_TIME_OFFSET
+		# Fréquence de la première ligne du spectrogramme (ligne 256 : 1500 Hz)
+		first_bin_frequency = 1500 - 256 * df
+		amplitude = np.sqrt(power)
+
+		start_time = time.time()
+		self.metrics = {"candidates": len(candidates), "synced": 0, "attempted": 0, "decoded": 0, "apriori": 0, "skipped": 0}
+
+		# Synchronisation des candidats par snr estimé décroissant
+		softs = []
+		dts = []
+		for i in range(len(candidates)):
+			if self.out_of_time():
+				break
+			center_bin = 256 + int(round(candidates["freq"][i] / df))
+			sync, center_bin, drift, shift, dt, soft = wspr_sync_search(
+				amplitude, np.arange(center_bin - 1, center_bin + 2), drifts, time_offset)
+			candidates["freq"][i] = (center_bin - 256) * df
+			candidates["drift"][i] = drift * df
+			candidates["shift"][i] = shift
+			candidates["sync"][i] = sync
+			softs.append(soft)
+			dts.append(dt)
+		self.metrics["synced"] = len(softs)
+
+		# Décodage par synchronisation décroissante, chaque candidat dans la limite de son budget
+		for i in np.argsort(-candidates["sync"][:len(softs)], kind="stable"):
+			if self.out_of_time():
+				break
+			self.metrics["attempted"] += 1
+			candidate_deadline = min(time.time() + self.candidate_budget, self.deadline)
+			center_bin = 256 + int(round(candidates["freq"][i] / df))
+			sync = candidates["sync"][i]
+
+			message = wspr_decode_soft(softs[i], candidate_deadline) if sync >= WSPR_MIN_SYNC else None
+			# Le cumul n'est tenté que si le signal est présent dans le cycle courant
+			stacked = (message is None and bool(self.history) and sync >= WSPR_MIN_STACK_SYNC
+				and time.time() < candidate_deadline)
+			if stacked:
+				message = self.decode_stacked(center_bin, sync, softs[i], drifts, time_offset, candidate_deadline)
+			apriori = message is None and self.known is not None
+			if apriori:
+				message = wspr_apriori_decode(softs[i], *self.known)
+			if message is None:
+				candidates["status"][i] = CANDIDATE_FAILED
+				continue
+			candidates["status"][i] = CANDIDATE_DECODED
+
+			call, grid, power = message
+			if any(decode["call"] == call and decode["grid"] == grid for decode in self.decodes):
+				continue
+			snr = float(candidates["snr"][i])
+			decode = {
+				"freq": float(first_bin_frequency + center_bin * df),
+				"snr": snr,
+				"dt": float(dts[i]),
+				"drift": float(candidates["drift"][i]),
+				"call": call,
+				"grid": grid,
+				"power": power,
+				"stacked": bool(stacked) and not apriori,
+				"apriori": apriori,
+			}
+			self.metrics["apriori"] += apriori
+			self.decodes.append(decode)
+			self.decode_found.emit(self.cycle_time, decode)
+
+		self.candidates = candidates
+		self.metrics["decoded"] = len(self.decodes)
+		self.metrics["skipped"] = int(np.count_nonzero(candidates["status"] == CANDIDATE_PENDING))
+		self.metrics["elapsed"] = time.time() - start_time
+		self.metrics["interrupted"] = self.out_of_time()
+		print(f"Decoded {self.metrics['decoded']} of {self.metrics['candidates']} candidates ({self.metrics['apriori']} a priori) "
+			f"in {self.metrics['elapsed']:.1f} s, "
+			f"{self.metrics['skipped']} skipped{' (deadline reached)' if self.metrics['interrupted'] else ''}")
+
+		self.metrics_ready.emit(self.metrics)
+		self.decodes_ready.emit(self.cycle_time, self.decodes)
+
+	def decode_stacked(self, center_bin, sync, soft, drifts, time_offset, deadline):
+		# Cumul des métriques souples du même signal sur les cycles précédents : chaque cycle est
+		# recalé en fréquence (+/-2 bins) et en dérive, puis pondéré par sa synchronisation
+		total = sync * soft
+		stacked_cycles = 1
+		if self.history_amplitudes is None:
+			# Spectrogrammes des cycles précédents, calculés une fois pour tous les candidats
+			self.history_amplitudes = [np.sqrt(wspr_spectrogram(baseband)) for baseband in self.history]
+		for amplitude in self.history_amplitudes:
+			if time.time() >= deadline:
+				return None
+			cycle_sync, _, _, _, _, cycle_soft = wspr_sync_search(
+				amplitude, np.arange(center_bin - 2, center_bin + 3), drifts, time_offset)
+			if cycle_sync >= WSPR_MIN_STACK_SYNC:
+				total += cycle_sync * cycle_soft
+				stacked_cycles += 1
+		if stacked_cycles < 2:
+			return None
+		message = wspr_decode_soft(total / np.sqrt(np.mean(total ** 2)), deadline)
+		# Les cycles précédents suffisent à décoder une station qui n'émet plus : le message doit
+		# aussi se retrouver dans les symboles du cycle courant
+		if message is None or (2.0 * wspr_data_bits([message])[0] - 1.0) @ soft / WSPR_SYMBOLS < WSPR_MIN_STACK_CORRELATION:
+			return None
+		return message
+
+
+class SpotUploader(QThread):
+	# Signal émis après chaque passe d'envoi : nombre de spots envoyés, nombre de lots en attente
+	upload_status = pyqtSignal(int, int)
+
+	def __init__(self, config):
+		super().__init__()
+		self.url = urllib.parse.urlsplit(config.get("Upload", "url", fallback="http://127.0.0.1:8073/spots"))
+		self.spool_dir = config.get("Upload", "spool_dir", fallback="spool")
+		self.timeout = config.getfloat("Upload", "timeout", fallback=10.0)
+		# Délai entre deux tentatives après un échec, doublé à chaque échec consécutif
+		self.backoff_min = config.getfloat("Upload", "backoff_min", fallback=5.0)
+		self.backoff_max = config.getfloat("Upload", "backoff_max", fallback=600.0)
+		os.makedirs(self.spool_dir, exist_ok=True)
+
+		# Lots transmis par le thread GUI, écrits sur disque par ce thread
+		self.pending = queue.Queue()
+		self.wakeup = threading.Event()
+		self.running = True
+		# Connexion HTTP persistante réutilisée d'un lot à l'autre
+		self.connection = None
+		self.sequence = 0
+
+	def enqueue(self, batch):
+		"""Ajoute le lot de spots d'un cycle à la file d'envoi, sans bloquer l'appelant."""
+		if batch.get("spots"):
+			self.pending.put(batch)
+			self.wakeup.set()
+
+	def stop(self):
+		self.running = False
+		self.wakeup.set()
+		self.wait()
+		self.spool_pending()
+		self.close_connection()
+
+	def run(self):
+		backoff = 0.0
+		retry_at = 0.0
+		while self.running:
+			self.wakeup.clear()
+			self.spool_pending()
+
+			# En attente après un échec : les nouveaux lots sont seulement mis sur disque
+			delay = retry_at - time.monotonic()
+			if delay > 0:
+				self.wakeup.wait(delay)
+				continue
+
+			batches = self.spooled_batches()
+			if not batches:
+				self.wakeup.wait()
+				continue
+
+			sent = 0
+			for path in batches:
+				if not self.running:
+					break
+				count = self.post_batch(path)
+				if count is None:
+					backoff = min(max(backoff * 2, self.backoff_min), self.backoff_max)
+					retry_at = time.monotonic() + backoff * random.uniform(0.8, 1.2)
+					break
+				sent += count
+				backoff = 0.0
+			self.upload_status.emit(sent, len(self.spooled_batches()))
+
+	def spool_pending(self):
+		# Écriture atomique de chaque lot dans la file persistante (un fichier par cycle)
+		while True:
+			try:
+				batch = self.pending.get_nowait()
+			except queue.Empty:
+				return
+			self.sequence += 1
+			name = f"{int(batch.get('time', time.time()))}_{os.getpid()}_{self.sequence:06d}.json"
+			tmp_path = os.path.join(self.spool_dir, name + ".tmp")
+			with open(tmp_path, "w") as spool_file:
+				json.dump(batch, spool_file)
+			os.replace(tmp_path, os.path.join(self.spool_dir, name))
+
+	def spooled_batches(self):
+		# Les noms commencent par l'heure du cycle : l'ordre alphabétique est l'ordre d'envoi
+		names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(".json"))
+		return [os.path.join(self.spool_dir, name) for name in names]
+
+	def post_batch(self, path):
+		"""Envoie un lot et le retire de la file ; retourne le nombre de spots envoyés, ou None s'il faut réessayer plus tard."""
+		with open(path, "rb") as spool_file:
+			body = spool_file.read()
+		try:
+			try:
+				reused = self.connection is not None
+				response = self.send(body)
+			except (ConnectionResetError, BrokenPipeError):
+				# Connexion persistante fermée par le serveur pendant l'inactivité : un seul nouvel essai immédiat
+				if not reused:
+					raise
+				self.close_connection()
+				response = self.send(body)
+		except (OSError, http.client.HTTPException) as e:
+			print(f"Spot upload failed: {e}")
+			self.close_connection()
+			return None
+
+		if response.will_close:
+			self.close_connection()
+		if 200 <= response.status < 300:
+			os.remove(path)
+			return len(json.loads(body).get("spots", []))
+		if 400 <= response.status < 500 and response.status not in (408, 429):
+			# Lot refusé définitivement : le mettre de côté pour ne pas bloquer la file
+			print(f"Spot batch rejected ({response.status} {response.reason}): {path}")
+			os.replace(path, path + ".rejected")
+			return 0
+		print(f"Spot server unavailable ({response.status} {response.reason}), will retry")
+		return None
+
+	def send(self, body):
+		if self.connection is None:
+			if self.url.scheme == "https":
+				self.connection = http.client.HTTPSConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+			else:
+				self.connection = http.client.HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+		self.connection.request("POST", self.url.path or "/", body=body, headers={"Content-Type": "application/json"})
+		response = self.connection.getresponse()
+		response.read()
+		return response
+
+	def close_connection(self):
+		if self.connection is not None:
+			self.connection.close()
+			self.connection = None
+
+class WSJTXUdpPublisher(QThread):
+	# Messages du protocole UDP de WSJT-X (NetworkMessage.hpp), sérialisation QDataStream big-endian
+	MAGIC = 0xadbccbda
+	SCHEMA = 2
+	HEARTBEAT, STATUS, DECODE, CLEAR, REPLY, QSO_LOGGED, CLOSE, REPLAY, HALT_TX, FREE_TEXT, WSPR_DECODE = range(11)
+	LOCATION, LOGGED_ADIF, HIGHLIGHT_CALLSIGN, SWITCH_CONFIGURATION, CONFIGURE = range(11, 16)
+	HEARTBEAT_INTERVAL = 15.0
+
+	# Signal émis vers le thread GUI pour chaque message de contrôle reçu : type et champs décodés
+	control_received = pyqtSignal(int, dict)
+
+	def __init__(self, config):
+		super().__init__()
+		self.server = (config.get("UDP", "host", fallback="127.0.0.1"), config.getint("UDP", "port", fallback=2237))
+		# Identifiant du client, unique par récepteur pour qu'un tableau de bord distingue les instances ;
+		# par défaut dérivé de l'indicatif et de la bande au démarrage (ex: WSQSO-F4HTB-40m)
+		default_id = "-".join(part for part in ("WSQSO", config.get("Station", "callsign", fallback=""),
+			config.get("Settings", "selected_band", fallback="")) if part)
+		self.client_id = config.get("UDP", "id", fallback=default_id)
+		self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		self.socket.bind(("", 0))
+		# Datagrammes déjà sérialisés, envoyés par ce thread
+		self.outbound = queue.Queue()
+		self.running = True
+
+	def stop(self):
+		self.outbound.put(self.serialize(self.CLOSE))
+		self.running = False
+		self.wait()
+		self.socket.close()
+
+	def run(self):
+		next_heartbeat = 0.0
+		while self.running:
+			now = time.monotonic()
+			if now >= next_heartbeat:
+				self.outbound.put(self.serialize(self.HEARTBEAT, self.pack_uint32(3), self.pack_utf8("1.0"), self.pack_utf8("")))
+				next_heartbeat = now + self.HEARTBEAT_INTERVAL
+			self.send_pending()
+			readable, _, _ = select.select([self.socket], [], [], 0.1)
+			if readable:
+				try:
+					datagram, _ = self.socket.recvfrom(65536)
+				except OSError:
+					continue
+				self.handle_datagram(datagram)
+		self.send_pending()
+
+	def send_pending(self):
+		while True:
+			try:
+				datagram = self.outbound.get_nowait()
+			except queue.Empty:
+				return
+			try:
+				self.socket.sendto(datagram, self.server)
+			except OSError as e:
+				print(f"UDP send failed: {e}")
+
+	def publish_decodes(self, cycle_time, decodes, dial_frequency, new=True):
+		"""Sérialise tous les messages WSPR décodés d'un cycle et les confie au thread d'envoi."""
+		cycle_ms = int(cycle_time % 86400) * 1000
+		for decode in decodes:
+			self.outbound.put(self.serialize(self.WSPR_DECODE,
+				self.pack_bool(new),
+				self.pack_uint32(cycle_ms),
+				self.pack_int32(round(decode["snr"])),
+				struct.pack(">d", decode["dt"]),
+				struct.pack(">Q", dial_frequency + round(decode["freq"])),
+				self.pack_int32(round(decode["drift"])),
+				self.pack_utf8(decode["call"]),
+				self.pack_utf8(decode["grid"]),
+				self.pack_int32(int(decode["power"])),
+				self.pack_bool(False)))
+
+	def publish_status(self, dial_frequency, tx_offset, de_call, de_grid, configuration_name, decoding=False):
+		self.outbound.put(self.serialize(self.STATUS,
+			struct.pack(">Q", dial_frequency),
+			self.pack_utf8("WSPR"),
+			self.pack_utf8(""),  # DX call
+			self.pack_utf8(""),  # Report
+			self.pack_utf8("WSPR"),
+			self.pack_bool(False),  # Tx enabled
+			self.pack_bool(False),  # Transmitting
+			self.pack_bool(decoding),
+			self.pack_uint32(tx_offset),  # Rx DF
+			self.pack_uint32(tx_offset),  # Tx DF
+			self.pack_utf8(de_call),
+			self.pack_utf8(de_grid),
+			self.pack_utf8(""),  # DX grid
+			self.pack_bool(False),  # Tx watchdog
+			self.pack_utf8(""),  # Sub-mode
+			self.pack_bool(False),  # Fast mode
+			struct.pack(">B", 0),  # Special operation mode
+			self.pack_uint32(0xffffffff),  # Frequency tolerance
+			self.pack_uint32(120),  # T/R period
+			self.pack_utf8(configuration_name),
+			self.pack_utf8("")))  # Tx message
+
+	def handle_datagram(self, datagram):
+		try:
+			magic, schema, message_type = struct.unpack_from(">III", datagram)
+			if magic != self.MAGIC:
+				return
+			client_id, offset = self.unpack_utf8(datagram, 12)
+			if client_id != self.client_id:
+				return
+			fields = {}
+			if message_type == self.SWITCH_CONFIGURATION:
+				fields["configuration_name"], offset = self.unpack_utf8(datagram, offset)
+			elif message_type == self.CONFIGURE:
+				fields["mode"], offset = self.unpack_utf8(datagram, offset)
+				fields["frequency_tolerance"], = struct.unpack_from(">I", datagram, offset)
+				fields["submode"], offset = self.unpack_utf8(datagram, offset + 4)
+				fields["fast_mode"], fields["tr_period"], fields["rx_df"] = struct.unpack_from(">?II", datagram, offset)
+			elif message_type == self.HALT_TX:
+				fields["auto_tx_only"], = struct.unpack_from(">?", datagram, offset)
+			elif message_type not in (self.REPLAY, self.CLEAR, self.CLOSE, self.HEARTBEAT):
+				return
+		except (struct.error, UnicodeDecodeError):
+			return
+		self.control_received.emit(message_type, fields)
+
+	def serialize(self, message_type, *fields):
+		return b"".join((struct.pack(">III", self.MAGIC, self.SCHEMA, message_type), self.pack_utf8(self.client_id)) + fields)
+
+	@staticmethod
+	def pack_utf8(text):
+		data = text.encode("utf-8")
+		return struct.pack(">I", len(data)) + data
+
+	@staticmethod
+	def unpack_utf8(datagram, offset):
+		length, = struct.unpack_from(">I", datagram, offset)
+		offset += 4
+		if length == 0xffffffff:
+			return "", offset
+		if offset + length > len(datagram):
+			raise struct.error("truncated utf8 field")
+		return datagram[offset:offset + length].decode("utf-8"), offset + length
+
+	@staticmethod
+	def pack_uint32(value):
+		return struct.pack(">I", value)
+
+	@staticmethod
+	def pack_int32(value):
+		return struct.pack(">i", value)
+
+	@staticmethod
+	def pack_bool(value):
+		return struct.pack(">?", value)
+
+class DecodeLogModel(QAbstractTableModel):
+	"""Journal des décodages : anneau borné en mémoire, chaque enregistrement est aussi ajouté au fichier journal.
+
+	Les entrées plus anciennes sont relues du fichier à la demande (load_older) et affichées avant l'anneau.
+	"""
+	COLUMNS = ("UTC", "dB", "DT", "Freq (MHz)", "Drift", "Call", "Grid", "dBm", "Band", "Mode")
+	# Indices des champs d'un enregistrement, dans l'ordre des colonnes
+	TIME, SNR, DT, FREQUENCY, DRIFT, CALL, GRID, POWER, BAND, MODE = range(len(COLUMNS))
+	# Taille moyenne d'une ligne du fichier, pour relire seulement la fin au démarrage
+	LINE_SIZE = 80
+	# Nombre d'entrées relues du fichier à chaque appel de load_older
+	LOAD_COUNT = 500
+
+	def __init__(self, capacity=2000, path=None, parent=None):
+		super().__init__(parent)
+		self.capacity = max(1, capacity)
+		self.records = [None] * self.capacity
+		# Position dans le fichier de la ligne de chaque enregistrement de l'anneau (None : non écrit)
+		self.offsets = [None] * self.capacity
+		self.start = 0
+		self.count = 0
+		# Entrées antérieures à l'anneau relues du fichier, (position, enregistrement) du plus ancien au plus récent
+		self.older = []
+		self.path = path
+		self.log_file = None
+		if path:
+			tail = self.read_records(path, None, self.capacity)
+			self.store([record for _, record in tail], [offset for offset, _ in tail])
+			try:
+				# Mode binaire : tell() donne la position exacte des lignes ajoutées
+				self.log_file = open(path, "ab")
+			except OSError as e:
+				print(f"Decode log {path} not writable: {e}")
+
+	@staticmethod
+	def make_record(cycle_time, decode, dial_frequency, band):
+		# Mode : vide pour un décodage de Fano sur le cycle seul, "stack" (cumul de cycles) ou "apriori"
+		mode = "apriori" if decode["apriori"] else "stack" if decode["stacked"] else ""
+		return (cycle_time, decode["snr"], decode["dt"], dial_frequency + decode["freq"], decode["drift"],
+			decode["call"], decode["grid"], decode["power"], band or "", mode)
+
+	@staticmethod
+	def format_line(record):
+		cycle_time, snr, dt, frequency, drift, call, grid, power, band, mode = record
+		# "-" pour une bande inconnue, afin que le mode reste le 11e champ
+		line = (f"{datetime.fromtimestamp(cycle_time, timezone.utc):%y%m%d %H%M} {snr:4.0f} {dt:5.1f} {frequency / 1e6:11.6f} "
+			f"{drift:3.0f}  {call} {grid} {power} {band or '-'} {mode}")
+		return line.rstrip() + "\n"
+
+	@staticmethod
+	def parse_line(line):
+		fields = line.split()
+		if len(fields) < 9:
+			return None
+		try:
+			cycle_time = datetime.strptime(fields[0] + fields[1], "%y%m%d%H%M").replace(tzinfo=timezone.utc).timestamp()
+			band = fields[9] if len(fields) > 9 and fields[9] != "-" else ""
+			return (cycle_time, float(fields[2]), float(fields[3]), float(fields[4]) * 1e6, float(fields[5]),
+				fields[6], fields[7], int(fields[8]), band, fields[10] if len(fields) > 10 else "")
+		except ValueError:
+			return None
+
+	def read_records(self, path, end, count):
+		"""Au plus count entrées du fichier situées avant la position end (None : fin du fichier), [(position, enregistrement)]."""
+		try:
+			with open(path, "rb") as log_file:
+				if end is None:
+					end = log_file.seek(0, os.SEEK_END)
+				offset = max(0, end - count * self.LINE_SIZE)
+				log_file.seek(offset)
+				data = log_file.read(end - offset)
+		except OSError:
+			return []
+		if offset > 0:
+			# Première ligne probablement tronquée
+			skip = data.find(b"\n") + 1
+			data = data[skip:]
+			offset += skip
+		records = []
+		for line in data.splitlines(keepends=True):
+			record = self.parse_line(line.decode("utf-8", errors="replace"))
+			if record is not None:
+				records.append((offset, record))
+			offset += len(line)
+		return records[-count:]
+
+	def store(self, records, offsets):
+		for record, offset in list(zip(records, offsets))[-self.capacity:]:
+			self.records[(self.start + self.count) % self.capacity] = record
+			self.offsets[(self.start + self.count) % self.capacity] = offset
+			if self.count < self.capacity:
+				self.count += 1
+			else:
+				self.start = (self.start + 1) % self.capacity
+
+	def load_older(self):
+		"""Relit du fichier jusqu'à LOAD_COUNT entrées précédant les plus anciennes affichées ; retourne leur nombre."""
+		if self.older:
+			end = self.older[0][0]
+		elif self.count:
+			end = self.offsets[self.start]
+		else:
+			return 0
+		if not self.path or end is None or end == 0:
+			return 0
+		loaded = self.read_records(self.path, end, self.LOAD_COUNT)
+		if loaded:
+			self.beginInsertRows(QModelIndex(), 0, len(loaded) - 1)
+			self.older = loaded + self.older
+			self.endInsertRows()
+		return len(loaded)
+
+	def add_records(self, records):
+		"""Ajoute d'un bloc les décodages d'un cycle, en retirant les plus anciens au-delà de la capacité."""
+		if not records:
+			return
+		offsets = self.write(records)
+		# Par tranches d'au plus capacity entrées, pour que celles qui traversent l'anneau rejoignent les anciennes
+		for first in range(0, len(records), self.capacity):
+			self.append_records(records[first:first + self.capacity], offsets[first:first + self.capacity])
+
+	def append_records(self, records, offsets):
+		overflow = self.count + len(records) - self.capacity
+		if overflow > 0:
+			# Les premières lignes affichées disparaissent ; si des entrées anciennes ont été relues, celles
+			# qui sortent de l'anneau les rejoignent et la fenêtre glisse sans changer de taille ni de trou
+			self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+			evicted = [(self.offsets[(self.start + i) % self.capacity], self.record(len(self.older) + i)) for i in range(overflow)]
+			self.older = (self.older + evicted)[overflow:]
+			self.start = (self.start + overflow) % self.capacity
+			self.count -= overflow
+			self.endRemoveRows()
+		first = len(self.older) + self.count
+		self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+		self.store(records, offsets)
+		self.endInsertRows()
+
+	def write(self, records):
+		# Retourne la position de la ligne de chaque enregistrement dans le fichier (None : non écrit)
+		if self.log_file is None:
+			return [None] * len(records)
+		lines = [self.format_line(record).encode("utf-8") for record in records]
+		try:
+			offset = self.log_file.tell()
+			self.log_file.write(b"".join(lines))
+			self.log_file.flush()
+		except OSError as e:
+			print(f"Decode log write failed: {e}")
+			return [None] * len(records)
+		offsets = []
+		for line in lines:
+			offsets.append(offset)
+			offset += len(line)
+		return offsets
+
+	def close(self):
+		if self.log_file is not None:
+			self.log_file.close()
+			self.log_file = None
+
+	def record(self, row):
+		if row < len(self.older):
+			return self.older[row][1]
+		return self.records[(self.start + row - len(self.older)) % self.capacity]
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self.older) + self.count
+
+	def columnCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self.COLUMNS)
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+			return self.COLUMNS[section]
+		return None
+
+	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+		if not index.isValid():
+			return None
+		column = index.column()
+		value = self.record(index.row())[column]
+		if role == Qt.ItemDataRole.DisplayRole:
+			if column == self.TIME:
+				return f"{datetime.fromtimestamp(value, timezone.utc):%H%M}"
+			if column == self.FREQUENCY:
+				return f"{value / 1e6:.6f}"
+			if column == self.DT:
+				return f"{value:.1f}"
+			if column in (self.SNR, self.DRIFT):
+				return f"{value:.0f}"
+			return str(value)
+		if role == Qt.ItemDataRole.UserRole:
+			# Valeur brute pour le tri
+			return value
+		if role == Qt.ItemDataRole.TextAlignmentRole and column <= self.DRIFT:
+			return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+		return None
+
+class DecodeFilterProxyModel(QSortFilterProxyModel):
+	"""Tri sur les valeurs brutes et filtrage par indicatif, SNR minimal et bande."""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.setSortRole(Qt.ItemDataRole.UserRole)
+		self.call_filter = ""
+		self.min_snr = None
+		self.band_filter = None
+
+	def set_filter(self, call="", min_snr=None, band=None):
+		self.call_filter = call.strip().upper()
+		self.min_snr = min_snr
+		self.band_filter = band
+		self.invalidateFilter()
+
+	def filterAcceptsRow(self, source_row, source_parent):
+		record = self.sourceModel().record(source_row)
+		if self.call_filter and self.call_filter not in record[DecodeLogModel.CALL]:
+			return False
+		if self.min_snr is not None and record[DecodeLogModel.SNR] < self.min_snr:
+			return False
+		if self.band_filter and record[DecodeLogModel.BAND] != self.band_filter:
+			return False
+		return True
 
 class WSQSOInterface(QMainWindow):
 	def __init__(self):
@@ -627,24 +2242,8 @@ class WSQSOInterface(QMainWindow):
 		else:
 			self.frequency_shift_value = int(self.config.get("Settings", "frequency_shift_value", fallback="1500"))
 	
-		# Band frequencies (MHz)
-		self.band_frequencies = {
-			"2200m": 138500,
-			"630m": 475200,
-			"160m": 1839600,
-			"80m": 3569600,
-			"60m": 5288200,
-			"40m": 7041100,
-			"30m": 10141200,
-			"20m": 14098100,
-			"17m": 18107100,
-			"15m": 21097100,
-			"12m": 24927100,
-			"10m": 28127100,
-			"6m": 50295500,
-			"4m": 70092000,
-			"2m": 144490000
-		}
+		# Band frequencies (Hz)
+		self.band_frequencies = BAND_FREQUENCIES
 
 		# Load selected band from config or set default
 		self.selected_band = self.config.get("Settings", "selected_band", fallback="40m")
@@ -745,9 +2344,59 @@ class WSQSOInterface(QMainWindow):
 		#########
 		
 		#########
-		# Messages Display Area
-		self.message_display = QTextEdit()
-		self.message_display.setReadOnly(True)
+		# Journal des décodages : table bornée en mémoire, historique complet dans le fichier [Log] file
+		self.decode_log = DecodeLogModel(
+			self.config.getint("Log", "capacity", fallback=2000),
+			self.config.get("Log", "file", fallback="decodes.txt"), self)
+		self.decode_proxy = DecodeFilterProxyModel(self)
+		self.decode_proxy.setSourceModel(self.decode_log)
+		self.decode_table = QTableView()
+		self.decode_table.setModel(self.decode_proxy)
+		self.decode_table.setSortingEnabled(True)
+		self.decode_table.sortByColumn(DecodeLogModel.TIME, Qt.SortOrder.AscendingOrder)
+		self.decode_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+		self.decode_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+		self.decode_table.setAlternatingRowColors(True)
+		# Hauteur de ligne fixe : la vue ne mesure que les lignes visibles
+		self.decode_table.verticalHeader().hide()
+		self.decode_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+		self.decode_table.verticalHeader().setDefaultSectionSize(self.decode_table.fontMetrics().height() + 4)
+		self.decode_table.horizontalHeader().setStretchLastSection(True)
+		self.decode_table.scrollToBottom()
+		# Décodages reçus pendant le cycle, insérés par lots dans la table
+		self.pending_records = []
+		self.decode_flush_timer = QTimer(self)
+		self.decode_flush_timer.setSingleShot(True)
+		self.decode_flush_timer.setInterval(250)
+		self.decode_flush_timer.timeout.connect(self.flush_decodes)
+
+		# Filtres du journal
+		self.call_filter_input = QLineEdit()
+		self.call_filter_input.setPlaceholderText("Call")
+		self.call_filter_input.setFixedWidth(100)
+		self.call_filter_input.textChanged.connect(self.update_decode_filter)
+		self.snr_filter_input = QSpinBox()
+		self.snr_filter_input.setRange(-41, 40)
+		self.snr_filter_input.setSpecialValueText("Any")  # -41 : pas de filtre SNR
+		self.snr_filter_input.setValue(-41)
+		self.snr_filter_input.valueChanged.connect(self.update_decode_filter)
+		self.band_filter_input = QComboBox()
+		self.band_filter_input.addItem("All")
+		self.band_filter_input.addItems(self.band_frequencies.keys())
+		self.band_filter_input.currentTextChanged.connect(self.update_decode_filter)
+		# Entrées sorties de la table, relues du fichier journal à la demande
+		self.load_older_button = QPushButton("Older")
+		self.load_older_button.setToolTip("Load earlier entries from the log file")
+		self.load_older_button.clicked.connect(self.load_older_decodes)
+		log_header_layout = QHBoxLayout()
+		log_header_layout.addWidget(QLabel("QSO Log:"))
+		log_header_layout.addWidget(self.load_older_button)
+		log_header_layout.addStretch()
+		log_header_layout.addWidget(self.call_filter_input)
+		log_header_layout.addWidget(QLabel("Min dB:"))
+		log_header_layout.addWidget(self.snr_filter_input)
+		log_header_layout.addWidget(QLabel("Band:"))
+		log_header_layout.addWidget(self.band_filter_input)
 		#########
 		
 		#########
@@ -789,8 +2438,8 @@ class WSQSOInterface(QMainWindow):
 		main_layout.addLayout(canvas_scale_layout, 0, 0, 1, 3)  # Combiner les deux widgets sur toute la largeur (3 colonnes)
 		main_layout.addWidget(freq_group, 1, 0, 1, 3)  # Frequency controls in QGroupBox
 		main_layout.addWidget(self.transmit_button, 2, 0, 1, 3)  # Transmit button below inputs
-		main_layout.addWidget(QLabel("QSO Log:"), 3, 0, 1, 3)
-		main_layout.addWidget(self.message_display, 4, 0, 1, 3)  # Message display area
+		main_layout.addLayout(log_header_layout, 3, 0, 1, 3)
+		main_layout.addWidget(self.decode_table, 4, 0, 1, 3)  # Decode log table
 		main_layout.addLayout(progress_layout, 5, 0, 1, 3)  # Ajouter à la fin du layout principal
 		main_widget.setLayout(main_layout)
 		#########
@@ -800,6 +2449,13 @@ class WSQSOInterface(QMainWindow):
 		self.scale_widget.set_shift_frequency(self.frequency_shift_value)
 		#########
 		
+		#########
+		# Services démarrés après l'affichage de la fenêtre (voir start_services)
+		self.udp_publisher = None
+		self.spot_uploader = None
+		self.last_decodes = (0.0, [])
+		#########
+
 		#########
 		# Set options after initializing components
 		for action in self.band_action_group.actions():
@@ -827,14 +2483,52 @@ class WSQSOInterface(QMainWindow):
 		# # Configuration pour l'audio
 		# # Instancier la classe AudioProcessor avec config et canvas
 		self.audio_processor = AudioProcessor(self.config, self.canvas)
-		# # Appeler setup_audio pour configurer et démarrer l'audio
-		self.audio_processor.setup_audio()
+		self.audio_processor.decode_listeners.append(self.handle_decodes)
+		self.audio_processor.decode_found_listeners.append(self.display_decode)
+		# # L'audio et les services réseau démarrent une fois la fenêtre et le waterfall dessinés
+		self.shown_time = None
+		self.canvas.first_painted.connect(self.window_shown)
 		# #########
+
+	def window_shown(self):
+		# Premier dessin du waterfall : les services démarrent au retour de l'événement de dessin
+		self.shown_time = time.perf_counter()
+		QTimer.singleShot(0, self.start_services)
+
+	def start_services(self):
+		# Appeler setup_audio pour configurer et démarrer l'audio
+		self.audio_processor.set_display_band(self.selected_band)
+		self.audio_processor.setup_audio()
+		self.audio_processor.load_known_messages()
+
+		# Envoi des spots vers le serveur de report (désactivé par défaut)
+		if self.config.getboolean("Upload", "enabled", fallback=False):
+			self.spot_uploader = SpotUploader(self.config)
+			self.spot_uploader.start()
+
+		# Diffusion UDP des décodages au format WSJT-X (désactivée par défaut)
+		if self.config.getboolean("UDP", "enabled", fallback=False):
+			self.udp_publisher = WSJTXUdpPublisher(self.config)
+			self.udp_publisher.control_received.connect(self.handle_udp_control)
+			self.udp_publisher.start()
+			self.publish_udp_status()
+
+	def stop_services(self):
+		# Les lots non envoyés restent dans la file disque pour le prochain démarrage
+		if self.spot_uploader is not None:
+			self.spot_uploader.stop()
+		if self.udp_publisher is not None:
+			self.udp_publisher.stop()
+		self.audio_processor.stop_audio()
+		self.timer_worker.requestInterruption()
+		self.timer_worker.wait()
+		self.flush_decodes()
+		self.decode_log.close()
 	
 	def update_time_where(self, value):
 		self.timer_progress.setValue(value)
 		if value == 0:  # À chaque début de cycle de 200 secondes
-			self.audio_processor.flag_get_audio_data = 1
+			self.audio_processor.start_cycle()
 			self.canvas.draw_time_marker()
 			self.timer_progress.setStyleSheet("QProgressBar{text-align: right;margin-right: 2em;} QProgressBar::chunk{background-color: #00b050;text-align: center;}")
 		if value == 114:
@@ -858,6 +2552,8 @@ class WSQSOInterface(QMainWindow):
 	def set_dial_frequency(self, frequency, band):
 		self.dial_input.setText(f"{int(frequency)}")
 		self.selected_band = band
+		if hasattr(self, "audio_processor"):
+			self.audio_processor.set_display_band(band)
 		# Update the checkmark in the Band menu
 		for action in self.band_action_group.actions():
 			action.setChecked(action.text() == band)
@@ -869,11 +2565,12 @@ class WSQSOInterface(QMainWindow):
 			self.tx_input.setText(f"{int(tx_freq)}")
 		except ValueError:
 			self.tx_input.setText("")
+		self.publish_udp_status()
 
 	def open_station_details(self):
 		dialog = StationDetailsDialog(self)
 		if dialog.exec() == QDialog.DialogCode.Accepted:
-			self.message_display.append(f"Station Details - Callsign: {self.callsign}, Grid: {self.grid}, Power: {self.power} dBm, Autogrid: {self.autogrid}")
+			self.statusBar().showMessage(f"Station Details - Callsign: {self.callsign}, Grid: {self.grid}, Power: {self.power} dBm, Autogrid: {self.autogrid}", 10000)
    
 	def open_frequency_shift_dialog(self):
 		dialog = FrequencyShiftDialog(self)
@@ -892,17 +2589,122 @@ class WSQSOInterface(QMainWindow):
 				print(f"Selected audio device: {self.audio_device.description()}")
 
 	
+	def display_decode(self, cycle_time, decode, band=None):
+		# Affiché peu après le décodage, sans attendre la fin du cycle de décodage ;
+		# les décodages proches sont regroupés en une seule insertion dans la table
+		try:
+			dial_frequency = self.band_frequencies[band] if band else int(self.dial_input.text())
+		except ValueError:
+			dial_frequency = 0
+		self.pending_records.append(DecodeLogModel.make_record(cycle_time, decode, dial_frequency, band or self.selected_band))
+		if not self.decode_flush_timer.isActive():
+			self.decode_flush_timer.start()
+
+	def flush_decodes(self):
+		self.decode_flush_timer.stop()
+		if not self.pending_records:
+			return
+		scrollbar = self.decode_table.verticalScrollBar()
+		at_bottom = scrollbar.value() == scrollbar.maximum()
+		records, self.pending_records = self.pending_records, []
+		self.decode_log.add_records(records)
+		if at_bottom:
+			self.decode_table.scrollToBottom()
+
+	def load_older_decodes(self):
+		if self.decode_log.load_older() == 0:
+			self.load_older_button.setEnabled(False)
+
+	def update_decode_filter(self):
+		min_snr = self.snr_filter_input.value()
+		band = self.band_filter_input.currentText()
+		self.decode_proxy.set_filter(self.call_filter_input.text(),
+			None if min_snr == self.snr_filter_input.minimum() else min_snr,
+			None if band == "All" else band)
+
+	def handle_decodes(self, cycle_time, decodes, band=None):
+		# Fin du cycle de décodage : le reste des décodages est inséré en un seul lot
+		self.flush_decodes()
+		# Les décodages par cumul ou a priori ne sont qu'affichés : le message WSPRDecode de WSJT-X ne
+		# permet pas de les distinguer, et les outils qui le reçoivent peuvent les rapporter comme des spots
+		decodes = [decode for decode in decodes if not (decode["stacked"] or decode["apriori"])]
+		# band : bande d'un canal du canaliseur, None pour la bande réglée dans l'interface
+		if band is None:
+			self.last_decodes = (cycle_time, decodes)
+			try:
+				dial_frequency = int(self.dial_input.text())
+			except ValueError:
+				return
+		else:
+			dial_frequency = self.band_frequencies[band]
+		if self.udp_publisher is not None:
+			self.udp_publisher.publish_decodes(cycle_time, decodes, dial_frequency)
+
+		# Un seul lot par cycle avec tous les messages décodés
+		if self.spot_uploader is None or not decodes:
+			return
+		spots = [{
+			"time": int(cycle_time),
+			"snr": round(decode["snr"]),
+			"dt": round(decode["dt"], 1),
+			"freq": dial_frequency + round(decode["freq"]),
+			"drift": round(decode["drift"]),
+			"call": decode["call"],
+			"grid": decode["grid"],
+			"power": decode["power"],
+		} for decode in decodes]
+		self.spot_uploader.enqueue({
+			"time": int(cycle_time),
+			"reporter": self.callsign,
+			"reporter_grid": self.grid,
+			"spots": spots,
+		})
+
+	def handle_udp_control(self, message_type, fields):
+		if message_type == WSJTXUdpPublisher.SWITCH_CONFIGURATION:
+			# Le nom de configuration est interprété comme le nom de la bande (ex: "40m")
+			band = fields["configuration_name"]
+			if band in self.band_frequencies:
+				self.set_dial_frequency(self.band_frequencies[band], band)
+		elif message_type == WSJTXUdpPublisher.CONFIGURE:
+			if 1400 <= fields["rx_df"] <= 1600:
+				self.shift_mode = "fixed"
+				self.frequency_shift_value = fields["rx_df"]
+				self.shift_freq_input.setText(str(self.frequency_shift_value))
+				self.scale_widget.set_shift_frequency(self.frequency_shift_value)
+				self.update_tx_frequency()
+		elif message_type == WSJTXUdpPublisher.REPLAY:
+			cycle_time, decodes = self.last_decodes
+			try:
+				self.udp_publisher.publish_decodes(cycle_time, decodes, int(self.dial_input.text()), new=False)
+			except ValueError:
+				pass
+		elif message_type == WSJTXUdpPublisher.HEARTBEAT:
+			self.publish_udp_status()
+
+	def publish_udp_status(self):
+		if self.udp_publisher is None:
+			return
+		try:
+			dial_frequency = int(self.dial_input.text())
+			tx_offset = int(self.shift_freq_input.text())
+		except ValueError:
+			return
+		self.udp_publisher.publish_status(dial_frequency, tx_offset, self.callsign, self.grid, self.selected_band)
+
 	def transmit_message(self):
-		self.message_display.append("Simulated message transmission.")
+		self.statusBar().showMessage("Simulated message transmission.", 10000)
 	
 	def closeEvent(self, event):
-		# Only save fixed shift mode to config if it's selected
-		self.config["Settings"] = {
+		# Only save fixed shift mode to config if it's selected; other [Settings] options are kept
+		self.config.read_dict({"Settings": {
 			"shift_mode": self.shift_mode,
 			"selected_band": self.selected_band,
-		}
+		}})
 		if self.shift_mode == "fixed":
 			self.config["Settings"]["frequency_shift_value"] = str(self.frequency_shift_value)
+		else:
+			self.config.remove_option("Settings", "frequency_shift_value")
  
 		# Save station details
 		self.config["Station"] = {
@@ -912,17 +2714,38 @@ class WSQSOInterface(QMainWindow):
 			"power": self.power
 		}
 
-		# Sauvegarder l'identifiant du périphérique audio
+		# Sauvegarder l'identifiant du périphérique audio, sans perdre les autres options de [Audio]
 		if hasattr(self, 'audio_device') and self.audio_device:
-			self.config["Audio"] = {
-				"device_id": self.audio_device.id()
-			}
+			self.config.read_dict({"Audio": {"device_id": self.audio_device.id()}})
  
 		with open("config.ini", "w") as configfile:
 			self.config.write(configfile)
+
+		self.stop_services()
 		event.accept()
 
-app = QApplication(sys.argv)
-window = WSQSOInterface()
-window.show()
-sys.exit(app.exec())
+def report_startup(app, window, budget):
+	# Appelé juste après start_services, lui-même lancé au premier dessin de la fenêtre
+	ready_time = time.perf_counter()
+	print(f"Startup: window shown after {window.shown_time - startup_time:.3f} s, "
+		f"audio ready after {ready_time - startup_time:.3f} s (budget {budget:.3f} s)")
+	window.stop_services()
+	app.exit(0 if ready_time - startup_time <= budget else 1)
+
+def main():
+	parser = argparse.ArgumentParser(description="WSPRQSO by F4HTB")
+	parser.add_argument("--startup-benchmark", type=float, metavar="SECONDS",
+		help="measure the startup time, exit with status 1 if it exceeds SECONDS")
+	args, qt_args = parser.parse_known_args()
+
+	app = QApplication(sys.argv[:1] + qt_args)
+	window = WSQSOInterface()
+	if args.startup_benchmark is not None:
+		# Connecté après WSQSOInterface.window_shown : le rapport passe après start_services
+		window.canvas.first_painted.connect(
+			lambda: QTimer.singleShot(0, lambda: report_startup(app, window, args.startup_benchmark)))
+	window.show()
+	sys.exit(app.exec())
+
+if __name__ == "__main__":
+	main()
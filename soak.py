@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Long-run soak test of the WSQSO receive pipeline, without a sound card.
+
+Synthetic WSPR cycles are fed to AudioProcessor as fast as possible, so a day
+of two-minute cycles runs in a few minutes. Memory (RSS and Python
+allocations), per-hop latency percentiles, running decode threads and the
+size of the decode log are sampled over windows of cycles, and the run fails
+if any of them trends upward:
+
+	python soak.py --cycles 10080   # one week of cycles
+"""
+import argparse, configparser, os, sys, tempfile, time, threading, tracemalloc
+import numpy as np
+
+# Pas besoin d'affichage pour le soak test
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication
+import WSQSO
+
+
+SAMPLE_RATE = 48000
+CYCLE_SAMPLES = 120 * SAMPLE_RATE
+BLOCK_SIZE = 4096
+STATIONS = [("K1ABC", "FN42", 37), ("F4HTB", "JN38", 27), ("G4ABC", "IO91", 23), ("VK2XYZ", "QF56", 30)]
+
+
+def synthetic_cycle(rng, snr_db=-20.0):
+	# Bruit blanc et quelques stations WSPR démarrant 1 s après la minute paire
+	noise_power = (SAMPLE_RATE / 2) / 2500
+	audio = rng.standard_normal(CYCLE_SAMPLES) * np.sqrt(noise_power)
+	samples_per_symbol = int(SAMPLE_RATE * WSQSO.WSPR_SYMBOL_PERIOD)
+	for i, (call, grid, power) in enumerate(STATIONS):
+		tones = np.repeat(WSQSO.wspr_encode(call, grid, power), samples_per_symbol).astype(np.float64)
+		frequency = 1420 + 50 * i + (tones - 1.5) * SAMPLE_RATE / 65536 * 2
+		phase = 2 * np.pi * np.cumsum(frequency) / SAMPLE_RATE
+		start = SAMPLE_RATE
+		audio[start:start + len(tones)] += np.sqrt(2 * 10 ** (snr_db / 10)) * np.cos(phase)
+	audio *= 3000 / np.std(audio)
+	return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def rss_bytes():
+	try:
+		with open("/proc/self/statm") as statm:
+			return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except OSError:
+		import resource
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def relative_trend(values):
+	"""Croissance sur toute la série estimée par régression linéaire, relative à sa moyenne."""
+	values = np.asarray(values, dtype=np.float64)
+	if len(values) < 3 or np.mean(np.abs(values)) == 0:
+		return 0.0
+	slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+	return slope * (len(values) - 1) / np.mean(np.abs(values))
+
+
+class Timer:
+	"""Enveloppe une méthode d'instance pour mesurer la durée de chaque appel."""
+	def __init__(self, owner, name):
+		self.samples = []
+		method = getattr(owner, name)
+
+		def timed(*args, **kwargs):
+			start = time.perf_counter()
+			result = method(*args, **kwargs)
+			self.samples.append(time.perf_counter() - start)
+			return result
+		setattr(owner, name, timed)
+
+	def take(self):
+		samples, self.samples = self.samples, []
+		return samples
+
+
+class SoakHarness:
+	def __init__(self, options):
+		self.options = options
+		self.config = configparser.ConfigParser()
+		self.config.read_dict({"Decode": {"stack_cycles": str(options.stack_cycles)}})
+
+		self.canvas = WSQSO.WaterfallCanvas()
+		# Horloge simulée, avancée avec les échantillons fournis : chaque cycle a sa propre minute paire
+		# et son échéance de décodage, quelle que soit l'heure réelle
+		self.start_time = float(int(time.time()) // 120 * 120)
+		self.simulated_time = self.start_time
+		self.processor = WSQSO.AudioProcessor(self.config, self.canvas, clock=lambda: self.simulated_time)
+		# Journal des décodages tel qu'alimenté par l'interface, un lot par cycle
+		self.log_directory = tempfile.TemporaryDirectory()
+		self.decode_log = WSQSO.DecodeLogModel(options.log_capacity, os.path.join(self.log_directory.name, "decodes.txt"))
+		self.processor.decode_listeners.append(self.display_decodes)
+
+		self.timers = {
+			"ingest": Timer(self.processor, "ingest"),
+			"fft": Timer(self.processor, "process_audio_data"),
+			"canvas": Timer(self.canvas, "update_data"),
+		}
+		self.decode_times = []
+		self.decodes = 0
+		self.watched_thread = None
+		self.windows = []
+
+	def display_decodes(self, cycle_time, decodes, band):
+		self.decode_log.add_records([WSQSO.DecodeLogModel.make_record(cycle_time, decode, 7038600, band) for decode in decodes])
+		self.decodes += len(decodes)
+
+	def watch_decode_thread(self):
+		thread = getattr(self.processor, "ws_decode_thread", None)
+		if thread is not None and thread is not self.watched_thread:
+			self.watched_thread = thread
+			thread.metrics_ready.connect(lambda metrics: self.decode_times.append(metrics["elapsed"]))
+
+	def run(self):
+		app = QApplication.instance()
+		rng = np.random.default_rng(self.options.seed)
+		cycles = [synthetic_cycle(rng, self.options.snr) for _ in range(2)]
+		if self.options.tracemalloc:
+			tracemalloc.start()
+
+		started = time.perf_counter()
+		for cycle in range(self.options.cycles):
+			cycle_time = self.start_time + 120 * cycle
+			self.simulated_time = cycle_time
+			self.processor.start_cycle()
+			audio = cycles[cycle % len(cycles)]
+			for offset in range(0, CYCLE_SAMPLES, BLOCK_SIZE):
+				self.simulated_time = cycle_time + min(offset + BLOCK_SIZE, CYCLE_SAMPLES) / SAMPLE_RATE
+				self.processor.ingest(audio[offset:offset + BLOCK_SIZE])
+				self.watch_decode_thread()
+				app.processEvents()
+
+			if (cycle + 1) % self.options.window == 0:
+				self.sample_window(cycle + 1, time.perf_counter() - started)
+
+		# Laisser terminer le dernier décodage
+		for thread in self.processor.decode_threads:
+			thread.wait()
+		app.processEvents()
+		self.decode_log.close()
+		return self.evaluate()
+
+	def running_qthreads(self):
+		threads = list(self.processor.decode_threads)
+		for thread in (self.processor.sample_source, self.processor.callsign_loader):
+			if thread is not None:
+				threads.append(thread)
+		return sum(thread.isRunning() for thread in threads)
+
+	def sample_window(self, cycles, elapsed):
+		window = {
+			"cycles": cycles,
+			"rss_mb": rss_bytes() / 2 ** 20,
+			"traced_mb": tracemalloc.get_traced_memory()[0] / 2 ** 20 if tracemalloc.is_tracing() else 0.0,
+			# Threads de décodage encore référencés par AudioProcessor, terminés ou non
+			"decode_threads": len(self.processor.decode_threads),
+			# threading ne voit pas les QThread : compter aussi ceux du pipeline encore actifs
+			"threads": threading.active_count() + self.running_qthreads(),
+			"log_rows": self.decode_log.rowCount(),
+		}
+		for name, timer in self.timers.items():
+			samples = np.array(timer.take()) * 1000
+			for percentile in (50, 95, 99):
+				window[f"{name}_p{percentile}_ms"] = float(np.percentile(samples, percentile)) if len(samples) else 0.0
+		decode_times = np.array(self.decode_times) * 1000
+		self.decode_times = []
+		window["decode_p95_ms"] = float(np.percentile(decode_times, 95)) if len(decode_times) else 0.0
+		self.windows.append(window)
+
+		simulated_hours = cycles * 2 / 60
+		print(f"{cycles:6d} cycles ({simulated_hours:6.1f} h simulated, x{simulated_hours * 3600 / elapsed:.0f}): "
+			f"RSS {window['rss_mb']:.1f} MB, traced {window['traced_mb']:.1f} MB, "
+			f"ingest p95 {window['ingest_p95_ms']:.2f} ms, canvas p95 {window['canvas_p95_ms']:.2f} ms, "
+			f"decode p95 {window['decode_p95_ms']:.0f} ms, decode threads {window['decode_threads']}, "
+			f"log {window['log_rows']} rows, {self.decodes} decodes", flush=True)
+
+	def evaluate(self):
+		# Ignorer les premières fenêtres (montée en charge des caches et de l'historique)
+		windows = self.windows[self.options.warmup:]
+		if len(windows) < 3:
+			print("Not enough windows to evaluate trends, increase --cycles")
+			return 2
+
+		limits = {
+			"rss_mb": self.options.memory_tolerance,
+			"traced_mb": self.options.memory_tolerance,
+			"ingest_p95_ms": self.options.latency_tolerance,
+			"fft_p95_ms": self.options.latency_tolerance,
+			"canvas_p95_ms": self.options.latency_tolerance,
+			"decode_p95_ms": self.options.latency_tolerance,
+		}
+		failures = []
+		for name, limit in limits.items():
+			trend = relative_trend([window[name] for window in windows])
+			if trend > limit:
+				failures.append(f"{name} grew by {trend:.0%} (limit {limit:.0%})")
+		# La table se remplit jusqu'à sa capacité, elle ne doit jamais la dépasser
+		if max(window["log_rows"] for window in windows) > self.decode_log.capacity:
+			failures.append(f"decode table holds more than {self.decode_log.capacity} rows")
+		for name in ("decode_threads", "threads"):
+			growth = windows[-1][name] - windows[0][name]
+			if growth > 0 and relative_trend([window[name] for window in windows]) > 0:
+				failures.append(f"{name} grew from {windows[0][name]} to {windows[-1][name]}")
+
+		if failures:
+			print("SOAK FAILED:\n  " + "\n  ".join(failures))
+			return 1
+		print(f"Soak passed: {self.options.cycles} cycles, {self.decodes} decodes, no upward trend")
+		return 0
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Accelerated long-run soak test of the WSQSO pipeline")
+	parser.add_argument("--cycles", type=int, default=720, help="two-minute cycles to simulate (720 = one day)")
+	parser.add_argument("--window", type=int, default=30, help="cycles per sampling window")
+	parser.add_argument("--warmup", type=int, default=2, help="windows ignored before evaluating trends")
+	parser.add_argument("--snr", type=float, default=-20.0, help="SNR of the synthetic stations in dB")
+	parser.add_argument("--stack-cycles", type=int, default=0, help="[Decode] stack_cycles for the run")
+	parser.add_argument("--log-capacity", type=int, default=2000, help="[Log] capacity of the decode table")
+	parser.add_argument("--memory-tolerance", type=float, default=0.05, help="allowed relative memory growth")
+	parser.add_argument("--latency-tolerance", type=float, default=0.25, help="allowed relative latency growth")
+	parser.add_argument("--tracemalloc", action="store_true", help="also track Python allocations (slower)")
+	parser.add_argument("--seed", type=int, default=1)
+	options = parser.parse_args()
+
+	app = QApplication(sys.argv[:1])
+	sys.exit(SoakHarness(options).run())
+
+
+if __name__ == "__main__":
+	main()
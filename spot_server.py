@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Local stand-in for a spot reporting server, used to test WSQSO uploads offline.
+
+Accepts the JSON batches posted by SpotUploader, counts them and prints the
+throughput. Outages can be simulated to check that queued batches are
+delivered once the server comes back:
+
+	python spot_server.py --port 8073 --outage-every 300 --outage-length 60
+"""
+import argparse, json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SpotStats:
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.started = time.monotonic()
+		self.batches = 0
+		self.spots = 0
+		self.refused = 0
+		self.invalid = 0
+
+	def as_dict(self):
+		with self.lock:
+			elapsed = time.monotonic() - self.started
+			return {
+				"uptime": round(elapsed, 1),
+				"batches": self.batches,
+				"spots": self.spots,
+				"refused": self.refused,
+				"invalid": self.invalid,
+				"spots_per_second": round(self.spots / elapsed, 2) if elapsed > 0 else 0.0,
+			}
+
+
+class SpotServer(ThreadingHTTPServer):
+	daemon_threads = True
+
+	def __init__(self, address, options):
+		super().__init__(address, SpotRequestHandler)
+		self.options = options
+		self.stats = SpotStats()
+
+	def in_outage(self):
+		# Panne périodique : les `outage_length` premières secondes de chaque période
+		if self.options.outage_every <= 0:
+			return False
+		elapsed = time.monotonic() - self.stats.started
+		return elapsed % self.options.outage_every < self.options.outage_length
+
+
+class SpotRequestHandler(BaseHTTPRequestHandler):
+	# HTTP/1.1 pour que le client puisse garder sa connexion ouverte
+	protocol_version = "HTTP/1.1"
+
+	def setup(self):
+		# Comme un vrai serveur, fermer les connexions persistantes inactives
+		self.timeout = self.server.options.idle_timeout or None
+		super().setup()
+
+	def do_GET(self):
+		if self.path == "/stats":
+			self.send_json(200, self.server.stats.as_dict())
+		else:
+			self.send_json(404, {"error": "not found"})
+
+	def do_POST(self):
+		length = int(self.headers.get("Content-Length", 0))
+		body = self.rfile.read(length)
+		stats = self.server.stats
+		options = self.server.options
+
+		if options.latency > 0:
+			time.sleep(options.latency / 1000.0)
+
+		if self.server.in_outage() or random.random() < options.fail_rate:
+			with stats.lock:
+				stats.refused += 1
+			self.send_json(503, {"error": "unavailable"})
+			return
+
+		try:
+			batch = json.loads(body)
+			spots = batch["spots"]
+			if not isinstance(spots, list):
+				raise ValueError("spots must be a list")
+		except (ValueError, KeyError, TypeError) as e:
+			with stats.lock:
+				stats.invalid += 1
+			self.send_json(400, {"error": str(e)})
+			return
+
+		with stats.lock:
+			stats.batches += 1
+			stats.spots += len(spots)
+		if options.verbose:
+			print(f"{batch.get('reporter', '?')}: {len(spots)} spots for cycle {batch.get('time', '?')}")
+		self.send_json(200, {"accepted": len(spots)})
+
+	def send_json(self, status, payload):
+		body = json.dumps(payload).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass
+
+
+def print_stats(server, interval):
+	while True:
+		time.sleep(interval)
+		stats = server.stats.as_dict()
+		state = "DOWN" if server.in_outage() else "up"
+		print(f"[{state}] {stats['batches']} batches, {stats['spots']} spots "
+			f"({stats['spots_per_second']}/s), {stats['refused']} refused, {stats['invalid']} invalid")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Local stand-in spot reporting server for WSQSO")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8073)
+	parser.add_argument("--fail-rate", type=float, default=0.0, help="probability of answering 503 to a batch")
+	parser.add_argument("--outage-every", type=float, default=0.0, help="period of simulated outages in seconds")
+	parser.add_argument("--outage-length", type=float, default=0.0, help="length of each simulated outage in seconds")
+	parser.add_argument("--idle-timeout", type=float, default=5.0, help="seconds before an idle connection is closed (0: never)")
+	parser.add_argument("--latency", type=float, default=0.0, help="added response time in milliseconds")
+	parser.add_argument("--stats-interval", type=float, default=10.0)
+	parser.add_argument("--verbose", action="store_true")
+	options = parser.parse_args()
+
+	server = SpotServer((options.host, options.port), options)
+	threading.Thread(target=print_stats, args=(server, options.stats_interval), daemon=True).start()
+	print(f"Spot server listening on http://{options.host}:{options.port}/spots")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	print(json.dumps(server.stats.as_dict()))
+
+
+if __name__ == "__main__":
+	main()